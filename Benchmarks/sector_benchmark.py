@@ -0,0 +1,189 @@
+import pandas as pd
+import argparse
+import datetime
+import importlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, REPO_DIR)
+from sector_data import SectorDataStore
+from figure_store import FigureStore
+from synthetic_data import make_synthetic_data
+from sector_analysis import load_section
+from sector_report_producer import REPORT_OPTIONS, build_report
+
+SECTOR = 'Synthetic'
+END_DATE = '2025/06'
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, 'results')
+
+# (report option key, produce function)
+SECTIONS = [
+    ("zscore", "produce_zscore_matrix"),
+    ("earnings_dividend", "produce_earnings_vs_div_plots"),
+    ("relative", "produce_relative_figures"),
+    ("individual", "produce_individual_analysis"),
+]
+
+def start_date_for(n_months):
+    """yyyy/mm start of a range covering n_months up to END_DATE."""
+    start = pd.Period(END_DATE.replace('/', '-'), freq='M') - (n_months - 1)
+    return start.strftime('%Y/%m')
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_DIR,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, dirty
+
+def package_versions():
+    versions = {}
+    for name in ("pandas", "numpy", "matplotlib", "seaborn", "openpyxl", "docx"):
+        try:
+            versions[name] = getattr(importlib.import_module(name), "__version__", "unknown")
+        except ImportError:
+            versions[name] = None
+    return versions
+
+def timed(function, *args, **kwargs):
+    started = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - started
+
+def run_case(n_tickers, n_months, sections, repeat, workers, keep=False, load_workers=1, section_workers=1):
+    """Benchmark one synthetic sector size and return {benchmark name: [seconds per run]}."""
+    workdir = tempfile.mkdtemp(prefix="sector-benchmark-")
+    cwd = os.getcwd()
+    timings = {}
+    try:
+        make_synthetic_data(os.path.join(workdir, 'data'), (SECTOR,), n_tickers, n_months)
+        # The report code reads data/ relative to the working directory
+        os.chdir(workdir)
+        start_date = start_date_for(n_months)
+        modules = {key: (load_section(key), function) for key, function in SECTIONS if key in sections}
+        selected_options = {key: key in sections for _, key in REPORT_OPTIONS}
+
+        for _ in range(repeat):
+            timings.setdefault('load_workbook', []).append(
+                timed(SectorDataStore, SECTOR, use_cache=False, load_workers=load_workers))
+            store = SectorDataStore(SECTOR, use_cache=False)
+
+            for key, (module, function) in modules.items():
+                figures = FigureStore(os.path.join(workdir, 'figures'), reuse=False)
+                kwargs = {'store': store, 'figures': figures}
+                if key in ("relative", "individual"):
+                    kwargs['workers'] = workers
+                seconds = timed(getattr(module, function), SECTOR, start_date, END_DATE, **kwargs)
+                timings.setdefault(function, []).append(seconds)
+                figures.cleanup_run()
+
+            # Cold build: no parsed-sheet cache and no reusable figures
+            shutil.rmtree(os.path.join(workdir, 'data', '.cache'), ignore_errors=True)
+            figures = FigureStore(os.path.join(workdir, 'figures'), reuse=False)
+            timings.setdefault('build_report', []).append(
+                timed(build_report, SECTOR, start_date, END_DATE, selected_options, workers=workers,
+                      output_dir=os.path.join(workdir, 'Reports'), figures=figures, load_workers=load_workers,
+                      section_workers=section_workers))
+    finally:
+        os.chdir(cwd)
+        if keep:
+            print(f"Benchmark files kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return timings
+
+def compare(results, baseline_path):
+    """Print the median of every benchmark against the same benchmark in a saved results file."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {(r['tickers'], r['months'], r['benchmark']): r['median'] for r in baseline['results']}
+    print(f"\nCompared with {baseline_path} ({(baseline.get('commit') or 'unknown')[:10]})")
+    for r in results:
+        before = previous.get((r['tickers'], r['months'], r['benchmark']))
+        if before is None:
+            continue
+        print(f"{r['tickers']:>7} {r['months']:>7} {r['benchmark']:<32} {before:>9.3f}s -> {r['median']:>9.3f}s "
+              f"x{r['median'] / before:.2f}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Time every report section and the full docx build on synthetic sector workbooks.")
+    parser.add_argument("--tickers", type=int, nargs="+", default=[10],
+                        help="Ticker counts to benchmark (default: 10). The relative section draws "
+                             "n*(n-1) charts, so leave it out with --sections for large counts.")
+    parser.add_argument("--months", type=int, nargs="+", default=[120],
+                        help="History lengths in months to benchmark (default: 120)")
+    parser.add_argument("--sections", nargs="+", choices=[key for key, *_ in SECTIONS],
+                        default=[key for key, *_ in SECTIONS], help="Sections to time (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark; min and median are kept (default: 3)")
+    parser.add_argument("--workers", type=int, default=1, help="Render workers for the chart sections (default: 1)")
+    parser.add_argument("--load-workers", type=int, default=1,
+                        help="Processes used to parse the workbook sheets (default: 1)")
+    parser.add_argument("--section-workers", type=int, default=1,
+                        help="Processes computing the report sections concurrently in build_report (default: 1)")
+    parser.add_argument("--output", help="Results JSON path (default: Benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", metavar="RESULTS", help="Earlier results JSON to compare the medians against")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated workbooks and reports")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    commit, dirty = git_commit()
+
+    results = []
+    for n_tickers in args.tickers:
+        for n_months in args.months:
+            print(f"Benchmarking {n_tickers} tickers x {n_months} months...")
+            timings = run_case(n_tickers, n_months, args.sections, args.repeat, args.workers, args.keep,
+                               args.load_workers, args.section_workers)
+            for name, runs in timings.items():
+                results.append({
+                    'tickers': n_tickers,
+                    'months': n_months,
+                    'benchmark': name,
+                    'runs': [round(seconds, 4) for seconds in runs],
+                    'min': round(min(runs), 4),
+                    'median': round(statistics.median(runs), 4),
+                })
+                print(f"{n_tickers:>7} {n_months:>7} {name:<32} min {min(runs):>9.3f}s  "
+                      f"median {statistics.median(runs):>9.3f}s")
+
+    summary = {
+        'commit': commit,
+        'dirty': dirty,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'packages': package_versions(),
+        'config': {'tickers': args.tickers, 'months': args.months, 'sections': args.sections,
+                   'repeat': args.repeat, 'workers': args.workers, 'load_workers': args.load_workers,
+                   'section_workers': args.section_workers},
+        'results': results,
+    }
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{(commit or 'nocommit')[:10]}{'-dirty' if dirty else ''}.json")
+    with open(output, 'w') as f:
+        json.dump(summary, f, indent=2)
+    print(f"Results saved to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+    return summary
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import argparse
+import os
+from openpyxl import Workbook
+
+PREAMBLE_ROWS = 4
+SHEET_COLUMNS = ['Dates', 'Close Adj. Ex. Div.', 'EPS Basic - TTM', 'P/E', 'Dividend Yield-TTM']
+
+def ticker_names(sector, n_tickers):
+    return [f"{sector[:3].upper()}{i:03d}" for i in range(n_tickers)]
+
+def write_company_names(data_dir, sectors, n_tickers):
+    """Write Company Names.xlsx with one sheet of tickers per sector."""
+    with pd.ExcelWriter(os.path.join(data_dir, 'Company Names.xlsx')) as writer:
+        for sector in sectors:
+            tickers = ticker_names(sector, n_tickers)
+            pd.DataFrame({
+                'Ticker': tickers,
+                'Name': [f"{sector} Company {i}" for i in range(n_tickers)],
+            }).to_excel(writer, sheet_name=sector, index=False)
+
+def write_sector_workbook(data_dir, sector, n_tickers, n_months, end_date='2025-06-30', seed=0):
+    """Write <sector>.xlsx with one sheet per ticker laid out like the exported data.
+
+    Each sheet has a 4-row preamble, the header row and monthly rows newest
+    first. Histories are staggered so some tickers start later than others,
+    and about 3% of P/E values are left blank.
+    """
+    rng = np.random.default_rng(seed)
+    wb = Workbook(write_only=True)
+    for i, ticker in enumerate(ticker_names(sector, n_tickers)):
+        ws = wb.create_sheet(ticker)
+        for row in range(PREAMBLE_ROWS):
+            ws.append([f"{ticker} export line {row + 1}"])
+        ws.append(SHEET_COLUMNS)
+
+        months = max(n_months - (i % 4) * (n_months // 10), 2)
+        dates = pd.date_range(end=end_date, periods=months, freq='ME')[::-1]
+        price = 50 * np.exp(np.cumsum(rng.normal(0, 0.05, months)))
+        eps = 3 * np.exp(np.cumsum(rng.normal(0, 0.03, months)))
+        pe = price / eps
+        pe[rng.random(months) < 0.03] = np.nan
+        dy = rng.uniform(0, 5, months)
+        for date, p, e, ratio, y in zip(dates, price, eps, pe, dy):
+            ws.append([date.to_pydatetime(), p, e, None if np.isnan(ratio) else ratio, y])
+    wb.save(os.path.join(data_dir, f"{sector}.xlsx"))
+
+def make_synthetic_data(data_dir, sectors=('Synthetic',), n_tickers=10, n_months=120, seed=0):
+    """Create a data folder with Company Names.xlsx and one workbook per sector."""
+    os.makedirs(data_dir, exist_ok=True)
+    write_company_names(data_dir, sectors, n_tickers)
+    for offset, sector in enumerate(sectors):
+        write_sector_workbook(data_dir, sector, n_tickers, n_months, seed=seed + offset)
+    return data_dir
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic sector workbooks for benchmarking.")
+    parser.add_argument("data_dir", help="Folder to write Company Names.xlsx and the sector workbooks to")
+    parser.add_argument("--sectors", nargs="+", default=["Synthetic"])
+    parser.add_argument("--tickers", type=int, default=10, help="Tickers per sector (default: 10)")
+    parser.add_argument("--months", type=int, default=120, help="Months of history per ticker (default: 120)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    make_synthetic_data(args.data_dir, args.sectors, args.tickers, args.months, args.seed)
+    print(f"Synthetic data written to {args.data_dir}")
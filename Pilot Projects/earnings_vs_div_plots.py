@@ -7,6 +7,10 @@ import seaborn as sns
 import os
 import time
 import calendar
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sector_data import load_company_names, load_sector_frames, slice_months
 
 # --- POPUP WINDOW FOR SECTOR SELECTION AND DATE RANGE ---
 def select_sector_and_dates():
@@ -78,11 +82,9 @@ sector, start_date, end_date = select_sector_and_dates()
 if sector is None or start_date is None or end_date is None:
     raise SystemExit("No sector or date range selected. Exiting.")
 
-# Set file paths based on sector
-excel_file_path = os.path.join(data_dir, f"{sector}.xlsx")
-
-# Load the company names data
-df = pd.read_excel(os.path.join(data_dir, 'Company Names.xlsx'), sheet_name=sector, engine='openpyxl')  # Use selected sector as sheet
+# Load the company names data and the normalized ticker sheets through the columnar cache under data/.cache
+df = load_company_names(sector, data_dir)  # Use selected sector as sheet
+ticker_frames, ticker_errors = load_sector_frames(sector, df['Ticker'].tolist(), data_dir)
 
 # Initialize columns in the DataFrame
 df['P/E'] = np.nan
@@ -96,10 +98,6 @@ df['Avg D/Y'] = np.nan
 df['D/Y Std Dev'] = np.nan
 df['Z-score D/Y'] = np.nan
 
-# Convert start and end date to Period for filtering
-start_period = pd.Period(start_date, freq='M')
-end_period = pd.Period(end_date, freq='M')
-
 # Find the latest date across all tickers after filtering
 latest_date = None
 
@@ -107,13 +105,9 @@ latest_date = None
 for index, row in df.iterrows():
     ticker = row['Ticker'] 
     try:
-        # Specify header=4 to start reading from the 5th row (0-indexed)
-        ticker_data = pd.read_excel(excel_file_path, sheet_name=ticker, header=4, engine='openpyxl')
-        ticker_data = ticker_data.rename(columns={'Close Adj. Ex. Div.': 'Last Price', 'EPS Basic - TTM': 'EPS', 'Dividend Yield-TTM': 'D/Y', 'Dates': 'Date'})
-        ticker_data['Date'] = pd.to_datetime(ticker_data['Date'], errors='coerce')
-        ticker_data = ticker_data.dropna(subset=['Date'])
-        ticker_data['Period'] = ticker_data['Date'].dt.to_period('M')
-        ticker_data = ticker_data[(ticker_data['Period'] >= start_period) & (ticker_data['Period'] <= end_period)]
+        if ticker in ticker_errors:
+            raise ticker_errors[ticker]
+        ticker_data = slice_months(ticker_frames[ticker], start_date, end_date)
         ticker_data = ticker_data.sort_values(by='Date', ascending=False)
 
         if ticker_data.empty:
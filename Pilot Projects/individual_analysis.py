@@ -5,6 +5,10 @@ import seaborn as sns
 import tkinter as tk
 from tkinter import ttk, messagebox
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sector_data import load_sector_frames, slice_months
 
 def select_sector():
     # Use absolute path to data folder relative to this script's parent directory
@@ -98,12 +102,8 @@ def select_ticker_and_dates(sector):
     )
 
 def filter_by_period(df, start, end):
-    df = df.copy()
-    # Parse 'Date' as datetime (dayfirst for dd/mm/yyyy), then filter by Period
-    df['Date'] = pd.to_datetime(df['Date'], dayfirst=True, errors='coerce')
-    start_period = pd.Period(start, freq='M')
-    end_period = pd.Period(end, freq='M')
-    df = df[(df['Date'].dt.to_period('M') >= start_period) & (df['Date'].dt.to_period('M') <= end_period)]
+    # Frames from load_sector_frames are sorted by date, so the month range is a binary-search slice
+    df = slice_months(df, start, end).copy()
     # Optionally, convert Date back to yyyy/mm for plotting
     df['Date'] = df['Date'].dt.strftime('%Y/%m')
     return df
@@ -120,17 +120,16 @@ ticker, start_date, end_date = select_ticker_and_dates(sector)
 if not ticker or not start_date or not end_date:
     raise SystemExit("Stock or date range not selected. Exiting.")
 
-sector_file = os.path.join(data_dir, f"{sector}.xlsx")
-usecols = ['Date', 'Close Adj. Ex. Div.', 'P/E', 'EPS Basic - TTM', 'Dividend Yield-TTM']
+# Cached frames already hold Date, Last Price, EPS, P/E and D/Y
 rename_dict = {
-    'Close Adj. Ex. Div.': 'Last Price',
-    'P/E': 'P/E',
-    'EPS Basic - TTM': 'EPS TTM',
-    'Dividend Yield-TTM': 'D/Y TTM'
+    'EPS': 'EPS TTM',
+    'D/Y': 'D/Y TTM'
 }
-HEADER_ROW = 4  # Adjust as needed
 
-df = pd.read_excel(sector_file, sheet_name=ticker, usecols=usecols, header=HEADER_ROW)
+frames, errors = load_sector_frames(sector, [ticker], data_dir)
+if errors:
+    raise SystemExit(f"Could not load {ticker}: {errors[ticker]}")
+df = frames[ticker]
 df = df.rename(columns=rename_dict)
 df = filter_by_period(df, start_date, end_date)
 df.set_index('Date', inplace=True)
@@ -5,6 +5,10 @@ import seaborn as sns
 import tkinter as tk
 from tkinter import ttk, messagebox
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sector_data import load_sector_frames, slice_months
 
 def select_sector():
     # Use absolute path to data folder relative to this script's parent directory
@@ -109,11 +113,8 @@ def select_tickers_and_dates(sector):
     )
 
 def filter_by_period(df, start, end):
-    df = df.copy()
-    df['Date'] = pd.to_datetime(df['Date'], dayfirst=True, errors='coerce')
-    start_period = pd.Period(start, freq='M')
-    end_period = pd.Period(end, freq='M')
-    df = df[(df['Date'].dt.to_period('M') >= start_period) & (df['Date'].dt.to_period('M') <= end_period)]
+    # Frames from load_sector_frames are sorted by date, so the month range is a binary-search slice
+    df = slice_months(df, start, end).copy()
     df['Date'] = df['Date'].dt.strftime('%Y/%m')
     return df
 
@@ -129,18 +130,17 @@ ticker1, ticker2, start_date, end_date = select_tickers_and_dates(sector)
 if not ticker1 or not ticker2 or not start_date or not end_date:
     raise SystemExit("Stocks or date range not selected. Exiting.")
 
-sector_file = os.path.join(data_dir, f"{sector}.xlsx")
-usecols = ['Date', 'Close Adj. Ex. Div.', 'P/E', 'EPS Basic - TTM', 'Dividend Yield-TTM']
+# Cached frames already hold Date, Last Price, EPS, P/E and D/Y
 rename_dict = {
-    'Close Adj. Ex. Div.': 'Last Price',
-    'P/E': 'P/E',
-    'EPS Basic - TTM': 'EPS TTM',
-    'Dividend Yield-TTM': 'D/Y TTM'
+    'EPS': 'EPS TTM',
+    'D/Y': 'D/Y TTM'
 }
-HEADER_ROW = 4  # Adjust as needed
 
-df1 = pd.read_excel(sector_file, sheet_name=ticker1, usecols=usecols, header=HEADER_ROW)
-df2 = pd.read_excel(sector_file, sheet_name=ticker2, usecols=usecols, header=HEADER_ROW)
+frames, errors = load_sector_frames(sector, [ticker1, ticker2], data_dir)
+if errors:
+    raise SystemExit(f"Could not load {', '.join(map(str, errors))}: {next(iter(errors.values()))}")
+df1 = frames[ticker1]
+df2 = frames[ticker2]
 
 df1 = df1.rename(columns=rename_dict)
 df2 = df2.rename(columns=rename_dict)
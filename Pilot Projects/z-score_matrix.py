@@ -7,6 +7,10 @@ import seaborn as sns
 from matplotlib.colors import TwoSlopeNorm
 import calendar
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sector_data import load_company_names, load_sector_frames, slice_months
 
 # --- POPUP WINDOW FOR SECTOR SELECTION AND DATE RANGE ---
 def select_sector_and_dates():
@@ -82,36 +86,30 @@ sector, start_date, end_date = select_sector_and_dates()
 if sector is None or start_date is None or end_date is None:
     raise SystemExit("No sector or date range selected. Exiting.")
 
-# Update all file paths to use the 'data' folder
-excel_file_path = os.path.join(data_dir, f"{sector}.xlsx")
-df = pd.read_excel(os.path.join(data_dir, 'Company Names.xlsx'), sheet_name=sector, engine='openpyxl')
+# Load the company names data through the columnar cache under data/.cache
+df = load_company_names(sector, data_dir)
 tickers = df['Ticker']
 matrix = pd.DataFrame(index=tickers, columns=tickers)
 
 print("Your request is being processed. Please wait...")
 
-# Convert start and end date to comparable format
-start_period = pd.Period(start_date, freq='M')
-end_period = pd.Period(end_date, freq='M')
-
-# Find the latest date across all tickers after filtering
+# Load and filter each ticker once; the pairwise loop below works on these in-memory frames.
+# Also find the latest date across all tickers after filtering
 latest_date = None
-for ticker in tickers:
+ticker_frames = {}
+ticker_errors = {}
+cached_frames, ticker_errors = load_sector_frames(sector, tickers, data_dir)
+for ticker, df_ticker in cached_frames.items():
     try:
-        df_ticker = pd.read_excel(excel_file_path, sheet_name=ticker, header=4, engine='openpyxl')
-        df_ticker = df_ticker.rename(columns={'Close Adj. Ex. Div.': 'Last Price', 'EPS Basic - TTM': 'EPS',
-                                              'Dividend Yield-TTM': 'D/Y', 'Dates': 'Date'})
-        df_ticker['Date'] = pd.to_datetime(df_ticker['Date'], dayfirst=True, errors='coerce')
-        df_ticker = df_ticker.fillna(0.01)
-        df_ticker = df_ticker[df_ticker['Date'].notna()]
-        df_ticker['Period'] = df_ticker['Date'].dt.to_period('M')
-        df_ticker = df_ticker[(df_ticker['Period'] >= start_period) & (df_ticker['Period'] <= end_period)]
+        # Frames are sorted by date, so the month range is a binary-search slice
+        df_ticker = slice_months(df_ticker, start_date, end_date).fillna(0.01)
+        ticker_frames[ticker] = df_ticker
         if not df_ticker.empty:
             max_date = df_ticker['Date'].max()
             if latest_date is None or max_date > latest_date:
                 latest_date = max_date
-    except Exception:
-        continue
+    except Exception as e:
+        ticker_errors[ticker] = e
 
 # Format the date range string for the plot title
 start_year, start_month = int(start_date[:4]), int(start_date[5:7])
@@ -123,27 +121,11 @@ date_range_str = f"{start_str} - {end_str}"
 for ticker1 in tickers:
     for ticker2 in tickers:
         try:
+            if ticker1 in ticker_errors or ticker2 in ticker_errors:
+                raise ticker_errors.get(ticker1, ticker_errors.get(ticker2))
             if ticker1 != ticker2:
-                df1 = pd.read_excel(excel_file_path, sheet_name=ticker1, header=4, engine='openpyxl')
-                df2 = pd.read_excel(excel_file_path, sheet_name=ticker2, header=4, engine='openpyxl')
-
-                df1 = df1.rename(columns={'Close Adj. Ex. Div.': 'Last Price', 'EPS Basic - TTM': 'EPS',
-                                           'Dividend Yield-TTM': 'D/Y', 'Dates': 'Date'})
-                df1['Date'] = pd.to_datetime(df1['Date'], dayfirst=True, errors='coerce')
-                df1 = df1.fillna(0.01)
-                df1 = df1[df1['Date'].notna()]
-                df1['Period'] = df1['Date'].dt.to_period('M')
-                df1 = df1[(df1['Period'] >= start_period) & (df1['Period'] <= end_period)]
-                df1.set_index('Date', inplace=True)
-
-                df2 = df2.rename(columns={'Close Adj. Ex. Div.': 'Last Price', 'EPS Basic - TTM': 'EPS',
-                                           'Dividend Yield-TTM': 'D/Y', 'Dates': 'Date'})
-                df2['Date'] = pd.to_datetime(df2['Date'], dayfirst=True, errors='coerce')
-                df2 = df2.fillna(0.01)
-                df2 = df2[df2['Date'].notna()]
-                df2['Period'] = df2['Date'].dt.to_period('M')
-                df2 = df2[(df2['Period'] >= start_period) & (df2['Period'] <= end_period)]
-                df2.set_index('Date', inplace=True)
+                df1 = ticker_frames[ticker1].set_index('Date')
+                df2 = ticker_frames[ticker2].set_index('Date')
 
                 # Align on index and fill NaN with 0.01
                 df_div = df1[['P/E']].div(df2[['P/E']])
@@ -159,18 +141,10 @@ for ticker1 in tickers:
                 Z = round((current_PE - PE_mean) / PE_std, 2) if PE_std != 0 else np.nan
                 matrix.loc[ticker1, ticker2] = Z
             else:
-                df_self = pd.read_excel(excel_file_path, sheet_name=ticker1, header=4, engine='openpyxl')
-                df_self = df_self.rename(columns={'Close Adj. Ex. Div.': 'Last Price', 'EPS Basic - TTM': 'EPS',
-                                                  'Dividend Yield-TTM': 'D/Y', 'Dates': 'Date'})
-                df_self['Date'] = pd.to_datetime(df_self['Date'], dayfirst=True, errors='coerce')
-                df_self = df_self.fillna(0.01)
-                df_self = df_self[df_self['Date'].notna()]
-                df_self['Period'] = df_self['Date'].dt.to_period('M')
-                df_self = df_self[(df_self['Period'] >= start_period) & (df_self['Period'] <= end_period)]
+                df_self = ticker_frames[ticker1]
                 if df_self.empty:
                     matrix.loc[ticker1, ticker2] = np.nan
                     continue
-                df_self = df_self.sort_values('Date')
                 PE_mean = df_self['P/E'].mean()
                 PE_std = df_self['P/E'].std()
                 current_PE = df_self['P/E'].iloc[-1]
@@ -0,0 +1,241 @@
+import numpy as np
+import copy
+import hashlib
+import inspect
+import json
+import os
+import re
+import shutil
+import uuid
+
+DEFAULT_ROOT = os.path.join('data', '.cache', 'figures')
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+KEY_SUFFIX = '.key'
+# Scratch folder of one run, named after the process that owns it
+RUN_DIR = re.compile(r'\.run-(\d+)-[0-9a-f]+')
+
+
+def _update_digest(digest, part):
+    if isinstance(part, np.ndarray):
+        array = np.ascontiguousarray(part)
+        if array.dtype == object:
+            digest.update(repr(array.tolist()).encode())
+        else:
+            digest.update(f"{array.dtype.str}{array.shape}".encode())
+            digest.update(array.tobytes())
+    elif isinstance(part, dict):
+        digest.update(b'{')
+        for key in sorted(part, key=str):
+            digest.update(repr(key).encode())
+            _update_digest(digest, part[key])
+        digest.update(b'}')
+    elif isinstance(part, (list, tuple)):
+        digest.update(b'[')
+        for item in part:
+            _update_digest(digest, item)
+        digest.update(b']')
+    else:
+        digest.update(repr(part).encode())
+    digest.update(b'|')
+
+
+def content_key(*parts):
+    """Hash strings, numbers, NumPy arrays and nested dicts/lists into a hex key."""
+    digest = hashlib.sha256()
+    for part in parts:
+        _update_digest(digest, part)
+    return digest.hexdigest()
+
+
+def code_key(function):
+    """Key for the source of a plotting function (or a module), so edits to a chart invalidate its renders."""
+    import matplotlib
+
+    try:
+        source = inspect.getsource(function)
+    except (OSError, TypeError):
+        source = getattr(function, '__qualname__', function.__name__)
+    return content_key(source, matplotlib.__version__)
+
+
+def _slug(value):
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', str(value)).strip('_') or '_'
+
+
+def _unique_slug(value):
+    # Names such as "A_B / C" and "A / B_C" slug alike, so a hash of the raw name keeps them apart
+    return f"{_slug(value)}-{hashlib.sha256(str(value).encode('utf-8')).hexdigest()[:8]}"
+
+
+def _pid_running(pid):
+    """True if a process with this pid is still running."""
+    if os.name == 'nt':
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return kernel32.GetLastError() == 5  # access denied: running under another user
+        code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+        kernel32.CloseHandle(handle)
+        return code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class FigureStore:
+    """Managed folder for rendered figures and computed values.
+
+    Every figure has a deterministic slot named after (sector, section,
+    ticker or pair, date range). Next to each file a .key sidecar records the
+    content key of the inputs it was drawn from (the input series slice, the
+    date range and the plotting code), so a later run reuses the file only
+    when that key still matches. Renders in progress go to a run-scoped
+    scratch folder that cleanup_run removes once the report is saved, and
+    evict keeps the whole store under max_bytes by dropping the least
+    recently used files. With reuse=False nothing is kept between runs.
+    """
+
+    def __init__(self, root=DEFAULT_ROOT, max_bytes=DEFAULT_MAX_BYTES, reuse=True):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.reuse = reuse
+        self._run_id = uuid.uuid4().hex[:8]
+        self._run_dir = None
+
+    @property
+    def run_dir(self):
+        if self._run_dir is not None:
+            return self._run_dir
+        # Includes the pid so sector reports built in other processes get their own scratch folder
+        return os.path.join(self.root, f".run-{os.getpid()}-{self._run_id}")
+
+    def shared_run(self):
+        """A copy that keeps this process's scratch folder in any process.
+
+        Hand it to workers that render for this process's report, so their
+        scratch files are released and cleaned up with the rest of the run.
+        """
+        shared = copy.copy(self)
+        shared._run_dir = self.run_dir
+        return shared
+
+    def slot(self, sector, section, name, start_date, end_date):
+        """Base path (without suffix) of the figure for name in a sector section and date range."""
+        date_range = f"{_slug(start_date)}-{_slug(end_date)}"
+        return os.path.join(self.root, _unique_slug(sector), _slug(section), f"{_unique_slug(name)}_{date_range}")
+
+    def scratch_path(self, suffix='.png'):
+        """A fresh run-scoped path to render into."""
+        os.makedirs(self.run_dir, exist_ok=True)
+        return os.path.join(self.run_dir, f"{uuid.uuid4().hex}{suffix}")
+
+    def lookup(self, key, slot, suffix='.png'):
+        """Return the stored file for slot if it was built from key, else None."""
+        if not self.reuse:
+            return None
+        path = f"{slot}{suffix}"
+        try:
+            with open(f"{path}{KEY_SUFFIX}") as f:
+                if f.read() != key or not os.path.exists(path):
+                    return None
+        except OSError:
+            return None
+        os.utime(path)  # mark as recently used for eviction
+        return path
+
+    def store(self, key, source_path, slot, suffix='.png'):
+        """Move a rendered scratch file into its slot and return the final path."""
+        if not self.reuse:
+            return source_path
+        path = f"{slot}{suffix}"
+        key_path = f"{path}{KEY_SUFFIX}"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Drop the old key first, so a crash before the new one is written
+        # leaves the slot unmatched rather than the new file under the old key
+        try:
+            os.remove(key_path)
+        except FileNotFoundError:
+            pass
+        shutil.move(source_path, path)
+        tmp_path = f"{key_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(key)
+        os.replace(tmp_path, key_path)
+        return path
+
+    def load_values(self, slot):
+        """Return the JSON-stored dict of computed values for slot, or an empty dict."""
+        path = f"{slot}.json"
+        if not self.reuse or not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def save_values(self, slot, values):
+        if not self.reuse:
+            return
+        path = f"{slot}.json"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(values, f)
+        os.replace(tmp_path, path)
+        os.utime(path)
+
+    def release(self, path):
+        """Delete path if it is one of this run's scratch files; stored figures are kept."""
+        if os.path.dirname(os.path.abspath(path)) == os.path.abspath(self.run_dir):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def cleanup_run(self):
+        """Delete this run's scratch files; call once the report that embeds them is saved."""
+        shutil.rmtree(self.run_dir, ignore_errors=True)
+
+    def remove_stale_runs(self):
+        """Delete the scratch folders of runs whose process is no longer running."""
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return
+        for name in names:
+            match = RUN_DIR.fullmatch(name)
+            if match and not _pid_running(int(match.group(1))):
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+
+    def evict(self):
+        """Delete stale run folders, then least recently used files until the store is within max_bytes."""
+        self.remove_stale_runs()
+        entries = []
+        total = 0
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.run-')]
+            for filename in filenames:
+                if filename.endswith(KEY_SUFFIX):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            for stale in (path, f"{path}{KEY_SUFFIX}"):
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+            total -= size
+        return total
@@ -0,0 +1,66 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from figure_store import code_key, content_key
+from timing import add_records, call_collected, stage
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _timed_render(render, job):
+    with stage('render', item=job['name']):
+        return render(job)
+
+
+def _collected_render(render, job):
+    # Runs in a worker process; the timings travel back with the result
+    return call_collected(_timed_render, render, job)
+
+
+def _render_jobs(render, jobs, workers):
+    """Yield render(job) for every job, in job order.
+
+    With workers > 1 the jobs are spread over a process pool whose workers draw
+    with the Agg backend, so matplotlib never runs in more than one thread per
+    process. render must be a module-level function of an importable module,
+    because spawned workers re-import it by name.
+    """
+    if workers <= 1:
+        for job in jobs:
+            yield _timed_render(render, job)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        for result, records in executor.map(partial(_collected_render, render), jobs):
+            add_records(records)
+            yield result
+
+
+def render_all(render, jobs, figures, slots, workers=1, progress=None):
+    """Yield the (name, path) result of render for every job, in job order.
+
+    slots gives each job's FigureStore slot. Jobs whose inputs and plotting
+    code match the file already in their slot reuse it; the others are drawn
+    into run-scoped scratch paths (passed to render as job['path']) and then
+    moved into their slot. Each job must carry its result name under 'name'.
+    progress, if given, is called as progress(done, total) as each job
+    finishes, just before its result is yielded.
+    """
+    render_key = code_key(render)
+    keys = [content_key(render_key, job) for job in jobs]
+    with stage('figure_lookup', count=len(jobs)):
+        cached = [figures.lookup(key, slot) for key, slot in zip(keys, slots)]
+    pending = [dict(job, path=figures.scratch_path()) for job, path in zip(jobs, cached) if path is None]
+    rendered = _render_jobs(render, pending, workers)
+    for done, (job, key, slot, path) in enumerate(zip(jobs, keys, slots, cached), 1):
+        if path is None:
+            result = next(rendered)
+            if result is not None:
+                result = (result[0], figures.store(key, result[1], slot))
+        else:
+            result = (job['name'], path)
+        if progress is not None:
+            progress(done, len(jobs))
+        yield result
@@ -0,0 +1,101 @@
+import importlib
+
+
+def report_range(start_date, end_date, settings):
+    """Data range of a section that reads only the report's own months."""
+    return start_date, end_date
+
+
+def rolling_range(start_date, end_date, settings):
+    """Data range of a section whose rolling overlay reads the history before start_date."""
+    return (None if settings.get('rolling_window') else start_date), end_date
+
+
+class ReportSection:
+    """One pluggable report section and the data it reads.
+
+    label and key are the option shown in the dialog and on the command line.
+    content names the function in module (a module of this package, imported
+    only when the section is selected) that takes a SectionContext and yields
+    the section's document items in order: ('heading', text, level),
+    ('paragraph', text) and ('picture', path). metrics are the panel metrics
+    it reads and data_range(start_date, end_date, settings) the yyyy/mm range
+    it reads them over, None for an open end.
+    """
+
+    def __init__(self, label, key, module, content, metrics, data_range=report_range):
+        self.label = label
+        self.key = key
+        self.module = module
+        self.content = content
+        self.metrics = metrics
+        self.data_range = data_range
+
+    def load(self):
+        """Import the section's module and return its content function."""
+        return getattr(importlib.import_module(f"{__name__}.{self.module}"), self.content)
+
+
+class SectionContext:
+    """What every section of one report is given.
+
+    store is the SectorDataStore loaded once for all the selected sections,
+    figures the FigureStore charts are rendered into and settings the run's
+    options (workers, relative_top_k, relative_unique_pairs, rolling_window).
+    progress_factory, when set, makes the progress callback of a chart
+    section from its label.
+    """
+
+    def __init__(self, sector, start_date, end_date, store, figures, settings=None, progress_factory=None):
+        self.sector = sector
+        self.start_date = start_date
+        self.end_date = end_date
+        self.store = store
+        self.figures = figures
+        self.settings = settings or {}
+        self.progress_factory = progress_factory
+
+    def progress(self, label):
+        return self.progress_factory(label) if self.progress_factory else None
+
+
+# Report sections in report order. Adding an analysis is one entry here and a
+# content function in its module; it reads the same loaded store as the rest.
+SECTIONS = [
+    ReportSection("Z-Score Matrix", "zscore", "sector_zscorematrix", "zscore_section", ['P/E']),
+    ReportSection("Earnings vs Dididend Plots", "earnings_dividend", "sector_earn_vs_div_plots",
+                  "earnings_vs_div_section", ['P/E', 'D/Y']),
+    ReportSection("Relative Graphs", "relative", "sector_relative_figures", "relative_section",
+                  ['Last Price', 'EPS', 'P/E'], rolling_range),
+    ReportSection("Individual Analysis", "individual", "sector_individual_analysis", "individual_section",
+                  ['Last Price', 'EPS', 'P/E'], rolling_range),
+    ReportSection("Z-Score Matrix Lookbacks", "zscore_windows", "sector_zscorematrix", "zscore_windows_section",
+                  ['P/E']),
+]
+
+
+def selected_sections(selected_options):
+    """The sections switched on in selected_options, in report order."""
+    return [section for section in SECTIONS if selected_options.get(section.key)]
+
+
+def data_needs(sections, start_date, end_date, settings):
+    """(metrics, (start, end)) covering everything the sections read; None is an open end."""
+    metrics = []
+    starts, ends = [], []
+    for section in sections:
+        metrics += [metric for metric in section.metrics if metric not in metrics]
+        start, end = section.data_range(start_date, end_date, settings)
+        starts.append(start)
+        ends.append(end)
+    start = None if None in starts else min(starts, default=start_date)
+    end = None if None in ends else max(ends, default=end_date)
+    return metrics, (start, end)
+
+
+def load_section(key):
+    """Import and return the module implementing the section with option key."""
+    for section in SECTIONS:
+        if section.key == key:
+            return importlib.import_module(f"{__name__}.{section.module}")
+    raise KeyError(f"Unknown report section: {key}")
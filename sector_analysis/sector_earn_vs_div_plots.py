@@ -1,41 +1,37 @@
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-import os
-import tempfile
+from sector_data import SectorDataStore
+from figure_store import FigureStore, code_key, content_key
+from timing import stage
 
-def produce_earnings_vs_div_plots(sector, start_date, end_date):
+PLOT_COLUMNS = ['Ticker', 'D/Y', 'Z-score P/E', 'Abs D/Y', 'Abs P/E']
+
+def produce_earnings_vs_div_plots(sector, start_date, end_date, store=None, figures=None):
     import calendar
 
-    excel_file_path = os.path.join('data', f"{sector}.xlsx")
-    df = pd.read_excel(os.path.join('data', 'Company Names.xlsx'), sheet_name=sector)
+    if store is None:
+        store = SectorDataStore(sector)
+    if figures is None:
+        figures = FigureStore()
+    df = store.companies.copy()
     tickers = df['Ticker']
 
     df['P/E'] = np.nan
     df['D/Y'] = np.nan
 
-    start_period = pd.Period(start_date, freq='M')
-    end_period = pd.Period(end_date, freq='M')
-    for idx, ticker in enumerate(tickers):
-        try:
-            tdf = pd.read_excel(excel_file_path, sheet_name=ticker, header=4)
-            tdf = tdf.rename(columns={
-                'Close Adj. Ex. Div.': 'Last Price',
-                'EPS Basic - TTM': 'EPS',
-                'Dividend Yield-TTM': 'D/Y',
-                'Dates': 'Date'
-            })
-            tdf['Date'] = pd.to_datetime(tdf['Date'], errors='coerce')
-            tdf = tdf.dropna(subset=['Date'])
-            tdf['Period'] = tdf['Date'].dt.to_period('M')
-            tdf = tdf[(tdf['Period'] >= start_period) & (tdf['Period'] <= end_period)]
-            tdf = tdf.sort_values('Date', ascending=False)
-            if not tdf.empty:
-                df.at[idx, 'P/E'] = tdf.iloc[0]['P/E']
-                df.at[idx, 'D/Y'] = tdf.iloc[0]['D/Y']
-        except Exception as e:
-            print(f"Error processing {ticker}: {e}")
+    # Latest P/E and D/Y of each ticker within the range
+    with stage('prepare'):
+        panel = store.panel.window(start_date, end_date)
+        for idx, ticker in enumerate(tickers):
+            if ticker in store.errors:
+                print(f"Error processing {ticker}: {store.errors[ticker]}")
+                continue
+            rows = np.flatnonzero(panel.rows(ticker))
+            if len(rows):
+                k = panel.position[ticker]
+                df.at[idx, 'P/E'] = panel.values['P/E'][rows[-1], k]
+                df.at[idx, 'D/Y'] = panel.values['D/Y'][rows[-1], k]
 
     df['Avg P/E'] = df['P/E'].mean(skipna=True)
     df['P/E Std Dev'] = df['P/E'].std(skipna=True)
@@ -52,6 +48,32 @@ def produce_earnings_vs_div_plots(sector, start_date, end_date):
     end_str = f"{calendar.month_name[end_month]} {end_year}"
     date_range_str = f"{start_str} - {end_str}"
 
+    key = content_key(code_key(render_earnings_vs_div_plots), df[PLOT_COLUMNS].to_numpy(), date_range_str)
+    slot1 = figures.slot(sector, 'earnings_dividend', 'zscore_pe_vs_dy', start_date, end_date)
+    slot2 = figures.slot(sector, 'earnings_dividend', 'abs_pe_vs_dy', start_date, end_date)
+    plot1_path = figures.lookup(key, slot1)
+    plot2_path = figures.lookup(key, slot2)
+    if plot1_path is None or plot2_path is None:
+        plot1_path = figures.scratch_path()
+        plot2_path = figures.scratch_path()
+        with stage('render', item='earnings_dividend'):
+            render_earnings_vs_div_plots(df, date_range_str, plot1_path, plot2_path)
+        plot1_path = figures.store(key, plot1_path, slot1)
+        plot2_path = figures.store(key, plot2_path, slot2)
+    return plot1_path, plot2_path
+
+def earnings_vs_div_section(context):
+    """Report content of the earnings vs dividend section."""
+    plot1_path, plot2_path = produce_earnings_vs_div_plots(context.sector, context.start_date, context.end_date,
+                                                           store=context.store, figures=context.figures)
+    yield 'heading', "2. Earnings vs Dividend Plots", 1
+    yield 'heading', '2.1 Z-score P/E vs D/Y', 2
+    yield 'picture', plot1_path
+    yield 'heading', '2.2 Abs P/E vs Abs D/Y', 2
+    yield 'picture', plot2_path
+
+def render_earnings_vs_div_plots(df, date_range_str, plot1_path, plot2_path):
+    """Draw both earnings vs dividend scatter plots to plot1_path and plot2_path."""
     # First plot: Z-score P/E vs D/Y
     yaxis = df['Z-score P/E'].max() if (df['Z-score P/E'].max()) > abs(df['Z-score P/E'].min()) else abs(df['Z-score P/E'].min())
     x_min = 0
@@ -75,8 +97,7 @@ def produce_earnings_vs_div_plots(sector, start_date, end_date):
     plt.title(f'Z-score P/E vs D/Y\n{date_range_str}', fontweight='bold')
     plt.tight_layout()
 
-    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmpfile1:
-        plot1_path = tmpfile1.name
+    with stage('png_encode', item='zscore_pe_vs_dy'):
         plt.savefig(plot1_path, bbox_inches='tight')
     plt.close()
 
@@ -103,9 +124,6 @@ def produce_earnings_vs_div_plots(sector, start_date, end_date):
     plt.title(f'Abs P/E vs Abs D/Y\n{date_range_str}', fontweight='bold')
     plt.tight_layout()
 
-    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmpfile2:
-        plot2_path = tmpfile2.name
+    with stage('png_encode', item='abs_pe_vs_dy'):
         plt.savefig(plot2_path, bbox_inches='tight')
     plt.close()
-
-    return plot1_path, plot2_path
\ No newline at end of file
@@ -0,0 +1,153 @@
+import pandas as pd
+import matplotlib.pyplot as plt
+from sector_data import SectorDataStore
+from zscore_engine import rolling_zscores
+from figure_store import FigureStore
+from render_pool import render_all
+from timing import stage
+
+def rolling_ticker_zscores(panel, tickers, window, min_periods=None):
+    """Rolling z-score of each ticker's P/E over the trailing window months, as a dates x tickers DataFrame."""
+    columns = [panel.position[ticker] for ticker in tickers]
+    z = rolling_zscores(panel.values['P/E'][:, columns], panel.present[:, columns], window, min_periods,
+                        panel.months)
+    return pd.DataFrame(z, index=pd.Index(panel.dates, name='Date'), columns=list(tickers))
+
+def prepare_individual_jobs(store, start_date, end_date, rolling_window=None):
+    """Build the per-ticker arrays that render_individual_figure needs.
+
+    With rolling_window each job also carries the rolling P/E z-score over
+    that many months.
+    """
+    jobs = []
+
+    panel = store.panel.window(start_date, end_date)
+    rolling = None
+    if rolling_window is not None:
+        # Use the history before start_date too, so the series is defined from the first month shown
+        rolling = rolling_ticker_zscores(store.panel, store.tickers, rolling_window).to_numpy()
+        rolling = rolling[store.panel.month_rows(start_date, end_date)]
+    for ticker in store.tickers:
+        try:
+            if ticker in store.errors:
+                raise store.errors[ticker]
+            k = panel.position[ticker]
+            rows = panel.rows(ticker)
+            if not rows.any():
+                continue
+            pe = pd.Series(panel.values['P/E'][rows, k])
+
+            job = {
+                'name': ticker,
+                'ticker': ticker,
+                'dates': panel.dates[rows],
+                'last_price': panel.values['Last Price'][rows, k],
+                'pe': pe.to_numpy(),
+                'eps': panel.values['EPS'][rows, k],
+                'mean_pe': pe.mean(),
+                'std_pe': pe.std(),
+            }
+            if rolling is not None:
+                job['rolling_window'] = rolling_window
+                job['rolling_z'] = rolling[rows, k]
+            jobs.append(job)
+        except Exception as e:
+            print(f"Error processing {ticker}: {e}")
+
+    return jobs
+
+def render_individual_figure(job):
+    """Draw one individual analysis chart to job['path'] and return (ticker, path), or None on failure."""
+    ticker = job['ticker']
+    try:
+        fig, ax1 = plt.subplots(figsize=(12, 6))
+        color1 = 'black'
+        color2 = 'tab:green'
+        color3 = 'tab:orange'
+
+        ax1.set_xlabel('Date', fontweight='bold')
+        ax1.set_ylabel('Last Price', color=color1, fontweight='bold')
+        l1, = ax1.plot(job['dates'], job['last_price'], color=color1, label='Last Price')
+        ax1.tick_params(axis='y', labelcolor=color1)
+        ax1.set_yscale('log')
+
+        # Second y-axis for P/E
+        ax2 = ax1.twinx()
+        ax2.set_ylabel('P/E', color=color2, fontweight='bold')
+        l2, = ax2.plot(job['dates'], job['pe'], color=color2, label='P/E')
+        mean_pe = job['mean_pe']
+        std_pe = job['std_pe']
+        ax2.axhline(mean_pe, color='blue', linestyle='--', linewidth=1, label='Mean Rel P/E')
+        ax2.axhline(mean_pe + std_pe, color='red', linestyle='--', linewidth=1, label='+1 Std Rel P/E')
+        ax2.axhline(max(mean_pe - std_pe, 1e-6), color='green', linestyle='--', linewidth=1, label='-1 Std Rel P/E')
+        ax2.tick_params(axis='y', labelcolor=color2)
+        ax2.set_yscale('log')
+
+        # Third y-axis for EPS
+        ax3 = ax1.twinx()
+        ax3.spines['right'].set_position(('outward', 60))
+        ax3.set_ylabel('EPS', color=color3, fontweight='bold')
+        l3, = ax3.plot(job['dates'], job['eps'], color=color3, label='EPS')
+        ax3.tick_params(axis='y', labelcolor=color3)
+        ax3.set_yscale('log')
+
+        lines = [l1, l2, l3]
+        if 'rolling_z' in job:
+            # Fourth y-axis for the rolling z-score of P/E
+            ax4 = ax1.twinx()
+            ax4.spines['right'].set_position(('outward', 120))
+            ax4.set_ylabel('Rolling Z-Score', color='tab:purple', fontweight='bold')
+            l4, = ax4.plot(job['dates'], job['rolling_z'], color='tab:purple', linewidth=1,
+                           label=f"{job['rolling_window']}M Rolling Z-Score P/E")
+            ax4.axhline(0, color='tab:purple', linestyle=':', linewidth=1)
+            ax4.tick_params(axis='y', labelcolor='tab:purple')
+            lines.append(l4)
+
+        plt.title(f'Individual Analysis: {ticker}', fontweight='bold')
+        labels = [l.get_label() for l in lines]
+        ax1.legend(lines, labels, loc='upper left')
+        fig.tight_layout()
+
+        with stage('png_encode', item=job['name']):
+            plt.savefig(job['path'], bbox_inches='tight')
+        plt.close(fig)
+
+        return (job['name'], job['path'])
+    except Exception as e:
+        plt.close('all')
+        print(f"Error processing {ticker}: {e}")
+        return None
+
+def iter_individual_analysis(sector, start_date, end_date, store=None, workers=1, figures=None, progress=None,
+                             rolling_window=None):
+    """Render the individual analysis charts, yielding (ticker, path) as each one is ready.
+
+    rolling_window overlays the rolling P/E z-score over that many months.
+    progress is passed on to render_all.
+    """
+    if store is None:
+        store = SectorDataStore(sector)
+    if figures is None:
+        figures = FigureStore()
+    with stage('prepare'):
+        jobs = prepare_individual_jobs(store, start_date, end_date, rolling_window)
+    slots = [figures.slot(sector, 'individual', job['name'], start_date, end_date) for job in jobs]
+    for plot in render_all(render_individual_figure, jobs, figures, slots, workers, progress):
+        if plot is not None:
+            yield plot
+
+def produce_individual_analysis(sector, start_date, end_date, store=None, workers=1, figures=None, rolling_window=None):
+    return list(iter_individual_analysis(sector, start_date, end_date, store, workers, figures,
+                                         rolling_window=rolling_window))
+
+def individual_section(context):
+    """Report content of the individual analysis section, yielded as each chart is rendered."""
+    settings = context.settings
+    plots = iter_individual_analysis(context.sector, context.start_date, context.end_date, store=context.store,
+                                     workers=settings.get('workers', 1), figures=context.figures,
+                                     progress=context.progress("Individual Analysis"),
+                                     rolling_window=settings.get('rolling_window'))
+    yield 'heading', "4. Individual Analysis", 1
+    for n, (ticker, plot_path) in enumerate(plots, 1):
+        yield 'heading', f"4.{n}. {ticker}", 2
+        yield 'picture', plot_path
@@ -0,0 +1,221 @@
+import pandas as pd
+import numpy as np
+import matplotlib.pyplot as plt
+from sector_data import SectorDataStore
+from zscore_engine import relative_zscore_matrix, rolling_pair_zscores
+from figure_store import FigureStore
+from render_pool import render_all
+from timing import stage
+
+def select_relative_pairs(panel, tickers, top_k=None):
+    """Pick the ordered pairs worth charting from their current relative P/E z-scores.
+
+    Pairs are scored with the z-score engine, as in the z-score matrix, without
+    building or drawing anything. Only one orientation of each unordered pair
+    is kept: the one whose numerator is rich (the higher z-score). With top_k
+    only the k most stretched of those are kept. Pairs come back in ticker order.
+    """
+    scored = [ticker for ticker in tickers if panel.rows(ticker).any()]
+    columns = [panel.position[ticker] for ticker in scored]
+    present = panel.present[:, columns]
+    pe = panel.values['P/E'][:, columns]
+    zscores = relative_zscore_matrix(np.where(present & np.isnan(pe), 0.01, pe), present)
+    rank = np.where(np.isnan(zscores), -np.inf, zscores)
+
+    candidates = []
+    for i in range(len(scored)):
+        for j in range(len(scored)):
+            # Higher z-score wins; ties (including two NaN scores) go to ticker order
+            if i != j and (rank[i, j], -i) > (rank[j, i], -j):
+                candidates.append((i, j))
+    if top_k is not None:
+        ranked = sorted((pair for pair in candidates if not np.isnan(zscores[pair])), key=lambda pair: -zscores[pair])
+        candidates = sorted(ranked[:top_k])
+    return [(scored[i], scored[j]) for i, j in candidates]
+
+def rolling_relative_zscores(panel, pairs, window, min_periods=None):
+    """Rolling z-score of each (ticker1, ticker2) pair's relative P/E over the trailing window months.
+
+    All pairs are computed in one vectorised pass. Returns a DataFrame with
+    one row per panel date and one "ticker1 / ticker2" column per pair.
+    """
+    z = rolling_pair_zscores(panel.values['P/E'], panel.present, [panel.position[ticker1] for ticker1, _ in pairs],
+                             [panel.position[ticker2] for _, ticker2 in pairs], window, min_periods,
+                             panel.months)
+    return pd.DataFrame(z, index=pd.Index(panel.dates, name='Date'),
+                        columns=[f"{ticker1} / {ticker2}" for ticker1, ticker2 in pairs])
+
+def prepare_relative_jobs(store, start_date, end_date, pairs=None, rolling_window=None):
+    """Build the per-pair arrays that render_relative_figure needs.
+
+    One job per ordered pair, or only for the (ticker1, ticker2) pairs given.
+    With rolling_window each job also carries the rolling relative P/E
+    z-score over that many months.
+    """
+    tickers = store.tickers
+    jobs = []
+
+    panel = store.panel.window(start_date, end_date)
+    if pairs is None:
+        pairs = [(ticker1, ticker2) for ticker1 in tickers for ticker2 in tickers
+                 if ticker1 != ticker2]  # Skip self/self
+
+    price = panel.values['Last Price']
+    eps = panel.values['EPS']
+    pe = panel.values['P/E']
+    rolling = None
+    if rolling_window is not None:
+        # Use the history before start_date too, so the series is defined from the first month shown
+        rolling = rolling_relative_zscores(store.panel, pairs, rolling_window).to_numpy()
+        rolling = rolling[store.panel.month_rows(start_date, end_date)]
+    for index, (ticker1, ticker2) in enumerate(pairs):
+        try:
+            for ticker in (ticker1, ticker2):
+                if ticker in store.errors:
+                    raise store.errors[ticker]
+            k1 = panel.position[ticker1]
+            k2 = panel.position[ticker2]
+
+            # Dates on which both tickers have a row
+            rows = panel.rows(ticker1) & panel.rows(ticker2)
+            if not rows.any():
+                continue
+            relative_pe = pd.Series(pe[rows, k1] / pe[rows, k2])
+
+            job = {
+                'name': f"{ticker1} / {ticker2}",
+                'ticker1': ticker1,
+                'ticker2': ticker2,
+                'dates': panel.dates[rows],
+                'relative_price': price[rows, k1] / price[rows, k2],
+                'relative_pe': relative_pe.to_numpy(),
+                'relative_eps': eps[rows, k1] / eps[rows, k2],
+                'mean_pe': relative_pe.mean(),
+                'std_pe': relative_pe.std(),
+            }
+            if rolling is not None:
+                job['rolling_window'] = rolling_window
+                job['rolling_z'] = rolling[rows, index]
+            jobs.append(job)
+        except Exception as e:
+            print(f"Error processing {ticker1} and {ticker2}: {e}")
+
+    return jobs
+
+def render_relative_figure(job):
+    """Draw one relative analysis chart to job['path'] and return (pair name, path), or None on failure."""
+    ticker1 = job['ticker1']
+    ticker2 = job['ticker2']
+    try:
+        fig, ax1 = plt.subplots(figsize=(12, 6))
+
+        color1 = 'black'
+        color2 = 'tab:green'
+        color3 = 'tab:orange'
+
+        ax1.set_xlabel('Date', fontweight='bold')
+        ax1.set_ylabel('Relative Price', color=color1, fontweight='bold')
+        l1, = ax1.plot(job['dates'], job['relative_price'], color=color1, label=f"Relative Price {ticker1}/{ticker2}")
+        ax1.tick_params(axis='y', labelcolor=color1)
+        ax1.set_yscale('log')
+
+        # Second y-axis for Relative P/E
+        ax2 = ax1.twinx()
+        ax2.set_ylabel('Relative P/E', color=color2, fontweight='bold')
+        l2, = ax2.plot(job['dates'], job['relative_pe'], color=color2, label=f"Relative P/E {ticker1}/{ticker2}")
+        mean_pe = job['mean_pe']
+        std_pe = job['std_pe']
+        ax2.axhline(mean_pe, color='blue', linestyle='--', linewidth=1, label='Mean Rel P/E')
+        ax2.axhline(mean_pe + std_pe, color='red', linestyle='--', linewidth=1, label='+1 Std Rel P/E')
+        ax2.axhline(max(mean_pe - std_pe, 1e-6), color='green', linestyle='--', linewidth=1, label='-1 Std Rel P/E')
+        ax2.tick_params(axis='y', labelcolor=color2)
+        ax2.set_yscale('log')
+
+        # Third y-axis for Relative EPS
+        ax3 = ax1.twinx()
+        ax3.spines['right'].set_position(('outward', 60))
+        ax3.set_ylabel('Relative EPS', color=color3, fontweight='bold')
+        l3, = ax3.plot(job['dates'], job['relative_eps'], color=color3, label=f"Relative EPS {ticker1}/{ticker2}")
+        ax3.tick_params(axis='y', labelcolor=color3)
+        ax3.set_yscale('log')
+
+        lines = [l1, l2, l3]
+        if 'rolling_z' in job:
+            # Fourth y-axis for the rolling z-score of Relative P/E
+            ax4 = ax1.twinx()
+            ax4.spines['right'].set_position(('outward', 120))
+            ax4.set_ylabel('Rolling Z-Score', color='tab:purple', fontweight='bold')
+            l4, = ax4.plot(job['dates'], job['rolling_z'], color='tab:purple', linewidth=1,
+                           label=f"{job['rolling_window']}M Rolling Z-Score Rel P/E")
+            ax4.axhline(0, color='tab:purple', linestyle=':', linewidth=1)
+            ax4.tick_params(axis='y', labelcolor='tab:purple')
+            lines.append(l4)
+
+        plt.title(f'Relative Analysis: {ticker1} / {ticker2}', fontweight='bold')
+        labels = [l.get_label() for l in lines]
+        ax1.legend(lines, labels, loc='upper left')
+        fig.tight_layout()
+
+        with stage('png_encode', item=job['name']):
+            plt.savefig(job['path'], bbox_inches='tight')
+        plt.close(fig)
+
+        return (job['name'], job['path'])
+    except Exception as e:
+        plt.close('all')
+        print(f"Error processing {ticker1} and {ticker2}: {e}")
+        return None
+
+def iter_relative_figures(sector, start_date, end_date, store=None, workers=1, figures=None, top_k=None,
+                          unique_pairs=False, progress=None, rolling_window=None):
+    """Render the relative analysis charts, yielding (pair name, path) as each one is ready.
+
+    By default every ordered pair is drawn. unique_pairs draws one orientation
+    per unordered pair and top_k only the k pairs with the most stretched
+    relative P/E z-score, so rendering scales with k instead of N^2.
+    rolling_window overlays the rolling relative P/E z-score over that many
+    months. progress is passed on to render_all.
+    """
+    if store is None:
+        store = SectorDataStore(sector)
+    if figures is None:
+        figures = FigureStore()
+    with stage('prepare'):
+        pairs = None
+        if top_k is not None or unique_pairs:
+            with stage('pair_scoring'):
+                for ticker in store.tickers:
+                    if ticker in store.errors:
+                        print(f"Error processing {ticker}: {store.errors[ticker]}")
+                pairs = select_relative_pairs(store.panel.window(start_date, end_date), store.tickers, top_k)
+        jobs = prepare_relative_jobs(store, start_date, end_date, pairs, rolling_window)
+    slots = [figures.slot(sector, 'relative', job['name'], start_date, end_date) for job in jobs]
+    for plot in render_all(render_relative_figure, jobs, figures, slots, workers, progress):
+        if plot is not None:
+            yield plot
+
+def produce_relative_figures(sector, start_date, end_date, store=None, workers=1, figures=None, top_k=None,
+                             unique_pairs=False, rolling_window=None):
+    """Render the relative analysis charts and return [(pair name, path)]; see iter_relative_figures."""
+    return list(iter_relative_figures(sector, start_date, end_date, store, workers, figures, top_k, unique_pairs,
+                                      rolling_window=rolling_window))
+
+def relative_section(context):
+    """Report content of the relative analysis section, yielded as each chart is rendered."""
+    settings = context.settings
+    plots = iter_relative_figures(context.sector, context.start_date, context.end_date, store=context.store,
+                                  workers=settings.get('workers', 1), figures=context.figures,
+                                  top_k=settings.get('relative_top_k'),
+                                  unique_pairs=settings.get('relative_unique_pairs', False),
+                                  progress=context.progress("Relative Analysis"),
+                                  rolling_window=settings.get('rolling_window'))
+    yield 'heading', "3. Relative Analysis", 1
+    # Pairs arrive grouped by numerator, so each chart is embedded as soon as it is rendered
+    numerators = []
+    for pair_name, plot_path in plots:
+        numerator = pair_name.split(" / ")[0]
+        if not numerators or numerators[-1] != numerator:
+            numerators.append(numerator)
+            yield 'heading', f"3.{len(numerators)}. {numerator}", 2
+        yield 'heading', f"Relative Analysis: {pair_name}", 3
+        yield 'picture', plot_path
@@ -0,0 +1,272 @@
+import pandas as pd
+import numpy as np
+import matplotlib.pyplot as plt
+import seaborn as sns
+from matplotlib.colors import TwoSlopeNorm
+import zscore_engine
+from sector_data import SectorDataStore, month_ordinal
+from zscore_engine import ZScoreMatrixHistory, relative_zscore_matrix, window_zscore_stack
+from figure_store import FigureStore, code_key, content_key
+from timing import stage
+
+# Trailing lookbacks, in months, drawn next to the full range by produce_zscore_windows
+LOOKBACK_MONTHS = [12, 36, 60]
+
+def compute_zscore_cells(dates, values, present, figures, cells_slot):
+    """Rounded z-score matrix for the dates x tickers P/E values, reusing cells stored in figures.
+
+    Stored cells are keyed by the content hash of both tickers' P/E slices
+    (diagonal cells by their ticker's hash alone, so tickers with identical
+    slices do not share them with their pair cells), and only the rows and
+    columns of tickers whose data changed are recomputed.
+    The hashes also cover the z-score engine's and this function's code, so a
+    change to the computation, the 0.01 fill or the rounding recomputes every
+    cell.
+    """
+    def cell_key(i, j):
+        return f"self:{hashes[i]}" if i == j else f"{hashes[i]}:{hashes[j]}"
+
+    n_tickers = values.shape[1]
+    engine = content_key(code_key(zscore_engine), code_key(compute_zscore_cells))
+    hashes = [content_key(engine, dates[present[:, k]], values[present[:, k], k]) for k in range(n_tickers)]
+    cached = figures.load_values(cells_slot)
+    cells = np.full((n_tickers, n_tickers), np.nan)
+    missing = np.ones((n_tickers, n_tickers), dtype=bool)
+    for i in range(n_tickers):
+        for j in range(n_tickers):
+            value = cached.get(cell_key(i, j), False)
+            if value is not False:
+                cells[i, j] = np.nan if value is None else value
+                missing[i, j] = False
+
+    changed = np.flatnonzero(missing.any(axis=0) | missing.any(axis=1))
+    if len(changed):
+        unchanged = np.setdiff1d(np.arange(n_tickers), changed)
+        cells[changed, :] = np.round(relative_zscore_matrix(values, present, rows=changed), 2)
+        cells[np.ix_(unchanged, changed)] = np.round(
+            relative_zscore_matrix(values, present, rows=unchanged, cols=changed), 2)
+        figures.save_values(cells_slot, {
+            cell_key(i, j): (None if np.isnan(cells[i, j]) else float(cells[i, j]))
+            for i in range(n_tickers) for j in range(n_tickers)
+        })
+    return cells
+
+def render_zscore_heatmap(matrix, date_range_str, heatmap_path):
+    """Draw the comparative z-score heatmap to heatmap_path."""
+    plt.figure(figsize=(10, 8))
+    norm = TwoSlopeNorm(vmin=matrix.astype(float).min().min(), vcenter=0, vmax=matrix.astype(float).max().max())
+    ax = sns.heatmap(
+        matrix.astype(float),
+        annot=True,
+        fmt=".2f",
+        cmap='RdYlGn_r',
+        cbar=True,
+        linewidths=0.5,
+        linecolor='gray',
+        norm=norm
+    )
+    for i in range(len(matrix)):
+        ax.add_patch(
+            plt.Rectangle(
+                (i, i), 1, 1, fill=False, edgecolor='black', lw=3
+            )
+        )
+    plt.title(f"Comparative Z-Score Matrix\n{date_range_str}", fontweight='bold')
+    plt.xlabel("Denominator", fontweight='bold')
+    plt.ylabel("Numerator", fontweight='bold')
+    plt.tight_layout()
+
+    with stage('png_encode', item='heatmap'):
+        plt.savefig(heatmap_path, bbox_inches='tight')
+    plt.close()
+
+def format_date_range(start_date, end_date):
+    import calendar
+
+    start_year, start_month = int(start_date[:4]), int(start_date[5:7])
+    end_year, end_month = int(end_date[:4]), int(end_date[5:7])
+    start_str = f"{calendar.month_name[start_month]} {start_year}"
+    end_str = f"{calendar.month_name[end_month]} {end_year}"
+    return f"{start_str} - {end_str}"
+
+def loaded_pe(store, panel):
+    """Loaded tickers with their P/E block and presence mask from panel; missing values count as 0.01."""
+    for ticker in store.tickers:
+        if ticker in store.errors:
+            print(f"Error processing {ticker}: {store.errors[ticker]}")
+    loaded = [ticker for ticker in store.tickers if ticker not in store.errors]
+    columns = [panel.position[ticker] for ticker in loaded]
+    present = panel.present[:, columns]
+    pe = panel.values['P/E'][:, columns]
+    return loaded, np.where(present & np.isnan(pe), 0.01, pe), present
+
+def sort_by_self_zscore(matrix, has_rows):
+    """Order matrix by its diagonal, descending, dropping loaded tickers without data in the range."""
+    self_zscores = {ticker: matrix.loc[ticker, ticker] for ticker in matrix.index
+                    if ticker not in has_rows or has_rows[ticker]}
+    sorted_tickers = sorted(self_zscores, key=lambda x: (self_zscores[x] if self_zscores[x] is not None else float('-inf')), reverse=True)
+    return matrix.loc[sorted_tickers, sorted_tickers]
+
+def produce_zscore_matrix(sector, start_date, end_date, store=None, figures=None):
+    if store is None:
+        store = SectorDataStore(sector)
+    if figures is None:
+        figures = FigureStore()
+    tickers = pd.Index(store.tickers, name='Ticker')
+    date_range_str = format_date_range(start_date, end_date)
+
+    # Slice every ticker's P/E history to the range in one step
+    with stage('prepare'):
+        panel = store.panel.window(start_date, end_date)
+        loaded, pe, present = loaded_pe(store, panel)
+
+    # Compute every cell in one batched pass; tickers that failed to load stay NaN
+    cells_slot = figures.slot(sector, 'zscore', 'cells', start_date, end_date)
+    matrix = pd.DataFrame(np.nan, index=tickers, columns=tickers)
+    with stage('zscore_compute', count=len(loaded)):
+        matrix.loc[loaded, loaded] = compute_zscore_cells(panel.dates, pe, present, figures, cells_slot)
+
+    # Sort by self z-score descending; tickers with no data in the range are left out
+    matrix = sort_by_self_zscore(matrix, dict(zip(loaded, present.any(axis=0))))
+
+    key = content_key(code_key(render_zscore_heatmap), list(matrix.index), matrix.to_numpy(dtype=float), date_range_str)
+    slot = figures.slot(sector, 'zscore', 'heatmap', start_date, end_date)
+    heatmap_path = figures.lookup(key, slot)
+    if heatmap_path is None:
+        heatmap_path = figures.scratch_path()
+        with stage('render', item='heatmap'):
+            render_zscore_heatmap(matrix, date_range_str, heatmap_path)
+        heatmap_path = figures.store(key, heatmap_path, slot)
+    return heatmap_path
+
+def zscore_section(context):
+    """Report content of the comparative z-score matrix section."""
+    heatmap_path = produce_zscore_matrix(context.sector, context.start_date, context.end_date,
+                                         store=context.store, figures=context.figures)
+    yield 'heading', "1. Comparative Z-Score Matrix", 1
+    yield 'picture', heatmap_path
+    yield 'paragraph', f"Date range: {context.start_date} to {context.end_date}"
+
+def lookback_windows(start_date, end_date, lookbacks=LOOKBACK_MONTHS):
+    """(title, start, end) yyyy/mm windows ending at end_date for each lookback shorter than the range, then the range itself."""
+    end = month_ordinal(end_date)
+    windows = []
+    for months in lookbacks:
+        if months < end - month_ordinal(start_date) + 1:
+            start = end - months + 1
+            windows.append((f"Last {months} months", f"{1970 + start // 12}/{start % 12 + 1:02d}", end_date))
+    windows.append(("Full range", start_date, end_date))
+    return windows
+
+def zscore_matrix_stack(store, windows):
+    """Comparative z-score matrices for several (start_date, end_date) windows in one pass.
+
+    Returns (stack, has_rows): a rounded windows x tickers x tickers array in
+    store.tickers order, NaN for tickers that failed to load, and a windows x
+    tickers mask of the tickers with data in each window. The cost is one pass
+    over the sector's dates plus O(N^2) per window.
+    """
+    loaded, pe, present = loaded_pe(store, store.panel)
+    rows = [store.panel.month_rows(start_date, end_date) for start_date, end_date in windows]
+    columns = [store.panel.position[ticker] for ticker in loaded]
+    stack = np.full((len(windows), len(store.tickers), len(store.tickers)), np.nan)
+    stack[np.ix_(range(len(windows)), columns, columns)] = np.round(
+        window_zscore_stack(pe, present, [(r.start, r.stop) for r in rows]), 2)
+    has_rows = np.zeros((len(windows), len(store.tickers)), dtype=bool)
+    has_rows[:, columns] = [present[r].any(axis=0) for r in rows]
+    return stack, has_rows
+
+def render_zscore_windows(matrices, titles, heatmap_path):
+    """Draw one comparative z-score heatmap per window side by side to heatmap_path."""
+    fig, axes = plt.subplots(1, len(matrices), figsize=(8 * len(matrices), 8), squeeze=False)
+    for ax, matrix, title in zip(axes[0], matrices, titles):
+        norm = TwoSlopeNorm(vmin=matrix.astype(float).min().min(), vcenter=0, vmax=matrix.astype(float).max().max())
+        sns.heatmap(
+            matrix.astype(float),
+            annot=True,
+            fmt=".2f",
+            cmap='RdYlGn_r',
+            cbar=True,
+            linewidths=0.5,
+            linecolor='gray',
+            norm=norm,
+            ax=ax
+        )
+        for i in range(len(matrix)):
+            ax.add_patch(plt.Rectangle((i, i), 1, 1, fill=False, edgecolor='black', lw=3))
+        ax.set_title(title, fontweight='bold')
+        ax.set_xlabel("Denominator", fontweight='bold')
+        ax.set_ylabel("Numerator", fontweight='bold')
+    fig.suptitle("Comparative Z-Score Matrix by Lookback", fontweight='bold')
+    fig.tight_layout()
+    plt.savefig(heatmap_path, bbox_inches='tight')
+    plt.close(fig)
+
+def produce_zscore_windows(sector, start_date, end_date, store=None, figures=None, lookbacks=LOOKBACK_MONTHS):
+    """Render the z-score matrix for each trailing lookback and the full range side by side; return its path."""
+    if store is None:
+        store = SectorDataStore(sector)
+    if figures is None:
+        figures = FigureStore()
+    tickers = pd.Index(store.tickers, name='Ticker')
+    windows = lookback_windows(start_date, end_date, lookbacks)
+
+    with stage('zscore_compute', count=len(windows)):
+        stack, has_rows = zscore_matrix_stack(store, [(start, end) for _, start, end in windows])
+    matrices = []
+    titles = []
+    for (title, start, end), cells, window_rows in zip(windows, stack, has_rows):
+        matrix = pd.DataFrame(cells, index=tickers, columns=tickers)
+        loaded = [ticker for ticker in tickers if ticker not in store.errors]
+        matrices.append(sort_by_self_zscore(matrix, {t: window_rows[store.panel.position[t]] for t in loaded}))
+        titles.append(f"{title}\n{format_date_range(start, end)}")
+
+    key = content_key(code_key(render_zscore_windows), titles, [list(m.index) for m in matrices],
+                      [m.to_numpy(dtype=float) for m in matrices])
+    slot = figures.slot(sector, 'zscore', 'lookbacks', start_date, end_date)
+    heatmap_path = figures.lookup(key, slot)
+    if heatmap_path is None:
+        heatmap_path = figures.scratch_path()
+        with stage('render', item='lookbacks'):
+            render_zscore_windows(matrices, titles, heatmap_path)
+        heatmap_path = figures.store(key, heatmap_path, slot)
+    return heatmap_path
+
+def zscore_windows_section(context):
+    """Report content of the z-score matrix lookbacks section."""
+    heatmap_path = produce_zscore_windows(context.sector, context.start_date, context.end_date,
+                                          store=context.store, figures=context.figures)
+    yield 'heading', "5. Z-Score Matrix Lookbacks", 1
+    yield 'picture', heatmap_path
+    yield 'paragraph', (f"Trailing lookbacks ending {context.end_date} next to the full range "
+                        f"{context.start_date} to {context.end_date}")
+
+def zscore_history(store, start_date, end_date, history=None):
+    """Comparative z-score matrix at every month from start_date to end_date, as a ZScoreMatrixHistory.
+
+    Every row joins the running sums but only the matrix after each month's
+    last row is kept: history.matrices is a months x tickers x tickers array
+    in store.tickers order and history.dates the date of each month's last
+    row; tickers that failed to load stay NaN. Pass the history returned by
+    an earlier call with the same start_date to append only the months after
+    its last date, at O(N^2) a row.
+    """
+    panel = store.panel.window(start_date, end_date)
+    if history is None:
+        history = ZScoreMatrixHistory(len(store.tickers))
+    rows = slice(0, len(panel.dates))
+    if history.dates:
+        rows = slice(np.searchsorted(panel.dates, history.dates[-1], side='right'), len(panel.dates))
+    present = panel.present[rows]
+    pe = panel.values['P/E'][rows]
+    months = panel.months[rows]
+    month_end = np.append(months[1:] != months[:-1], True)
+    with stage('zscore_history', count=len(present)):
+        history.extend(panel.dates[rows], np.where(present & np.isnan(pe), 0.01, pe), present, month_end)
+    return history
+
+def zscore_cell_history(history, tickers, ticker1, ticker2):
+    """Rounded z-score history of cell (ticker1, ticker2), the P/E of ticker1 relative to ticker2, as a Series."""
+    tickers = list(tickers)
+    return pd.Series(np.round(history.matrices[:, tickers.index(ticker1), tickers.index(ticker2)], 2),
+                     index=pd.Index(history.dates, name='Date'), name=f"{ticker1} / {ticker2}")
@@ -0,0 +1,541 @@
+import pandas as pd
+import numpy as np
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from urllib.parse import quote
+from timing import add_records, call_collected, stage
+from xlsx_reader import XlsxWorkbook
+
+try:
+    import pyarrow  # noqa: F401
+    CACHE_FORMAT = 'parquet'
+except ImportError:
+    CACHE_FORMAT = 'pickle'
+
+# How ticker sheets are parsed: python-calamine through pandas when it is
+# installed, otherwise the streaming reader in xlsx_reader ('openpyxl' is
+# the plain pandas path).
+try:
+    import python_calamine  # noqa: F401
+    XLSX_READER = 'calamine'
+except ImportError:
+    XLSX_READER = 'stream'
+
+HEADER_ROW = 4
+RENAME_COLUMNS = {
+    'Close Adj. Ex. Div.': 'Last Price',
+    'EPS Basic - TTM': 'EPS',
+    'P/E - TTM': 'P/E',
+    'Dividend Yield-TTM': 'D/Y',
+    'Dates': 'Date'
+}
+CACHE_COLUMNS = ['Date', 'Last Price', 'EPS', 'P/E', 'D/Y']
+# Sheet headers that normalize_ticker_frame keeps, before and after renaming
+SHEET_HEADERS = set(RENAME_COLUMNS) | set(CACHE_COLUMNS)
+DATE_HEADERS = {'Dates', 'Date'}
+PANEL_METRICS = CACHE_COLUMNS[1:]
+CACHE_DIR_NAME = '.cache'
+# Version of what a cached frame holds; bump it whenever the normalization or
+# the sheet readers change their output, so caches written before are rebuilt
+CACHE_SCHEMA = 2
+
+
+def normalize_ticker_frame(df):
+    """Apply the column renames and date parsing shared by every Sector Analysis module."""
+    rename = {k: v for k, v in RENAME_COLUMNS.items() if k in df.columns and v not in df.columns}
+    df = df.rename(columns=rename)
+    df = df[[c for c in CACHE_COLUMNS if c in df.columns]].copy()
+    df['Date'] = pd.to_datetime(df['Date'], dayfirst=True, errors='coerce')
+    df = df.dropna(subset=['Date'])
+    for column in df.columns.drop('Date'):
+        df[column] = pd.to_numeric(df[column], errors='coerce').astype(float)
+    df = df.sort_values('Date').reset_index(drop=True)
+    return df
+
+
+def columns_frame(columns):
+    """normalize_ticker_frame for {header: array} columns that are already datetime64 and float."""
+    rename = {k: v for k, v in RENAME_COLUMNS.items() if k in columns and v not in columns}
+    columns = {rename.get(k, k): v for k, v in columns.items()}
+    dates = columns['Date']
+    # Drop undated rows and sort as dropna and sort_values would, on the arrays directly
+    rows = np.flatnonzero(~np.isnat(dates))
+    rows = rows[np.argsort(dates[rows].view(np.int64), kind='quicksort')]
+    return pd.DataFrame({c: columns[c][rows] for c in CACHE_COLUMNS if c in columns})
+
+
+def parse_workbook_frames(excel_file_path, tickers, engine=None):
+    """Open a sector workbook once with pandas and normalize the sheet of every ticker."""
+    frames = {}
+    errors = {}
+    with pd.ExcelFile(excel_file_path, engine=engine) as xl:
+        for ticker in tickers:
+            try:
+                with stage('workbook_parse', item=ticker):
+                    df = xl.parse(sheet_name=ticker, header=HEADER_ROW)
+                with stage('normalize', item=ticker):
+                    frames[ticker] = normalize_ticker_frame(df)
+            except Exception as e:
+                errors[ticker] = e
+    return frames, errors
+
+
+def _read_sheet_columns(excel_file_path, tickers):
+    """Stream the kept columns of each ticker's sheet.
+
+    Returns ({ticker: {header: array}}, errors, fallback) where fallback lists
+    the tickers to parse with pandas: missing sheets, sheets the stream
+    reader cannot read exactly as pandas would and sheets it failed on, so
+    the only errors reported are pandas' own. errors is always empty and is
+    kept so the result unpacks like parse_workbook_frames'.
+    """
+    parsed = {}
+    errors = {}
+    fallback = []
+    try:
+        workbook = XlsxWorkbook(excel_file_path)
+    except Exception:
+        return parsed, errors, list(tickers)
+    with workbook:
+        for ticker in tickers:
+            if not isinstance(ticker, str) or ticker not in workbook.sheets:
+                fallback.append(ticker)
+                continue
+            try:
+                with stage('workbook_parse', item=ticker):
+                    parsed[ticker] = workbook.read_columns(ticker, HEADER_ROW, SHEET_HEADERS, DATE_HEADERS)
+            except Exception:
+                # UnsupportedSheet, or a failure of the reader itself: pandas decides
+                fallback.append(ticker)
+    return parsed, errors, fallback
+
+
+def _share_sheet_columns(excel_file_path, tickers):
+    """Worker side of _read_sheets_in_workers: parse tickers' sheets into one shared memory block.
+
+    Returns (block name, layout, errors, fallback); layout lists each ticker's
+    columns as (header, dtype, offset, length) in the block, which the parent
+    copies out and unlinks.
+    """
+    parsed, errors, fallback = _read_sheet_columns(excel_file_path, tickers)
+    arrays = [(ticker, header, array) for ticker, columns in parsed.items() for header, array in columns.items()]
+    size = max(sum(array.nbytes for _, _, array in arrays), 1)
+    # The parent unlinks the block, so this process must not track it and
+    # clean it up (or warn about it) when the pool shuts down
+    try:
+        block = SharedMemory(create=True, size=size, track=False)
+    except TypeError:
+        block = SharedMemory(create=True, size=size)
+        if os.name == 'posix':
+            resource_tracker.unregister(block._name, 'shared_memory')
+    layout = {ticker: [] for ticker in parsed}
+    offset = 0
+    for ticker, header, array in arrays:
+        np.ndarray(array.shape, array.dtype, buffer=block.buf, offset=offset)[:] = array
+        layout[ticker].append((header, array.dtype.str, offset, len(array)))
+        offset += array.nbytes
+    block.close()
+    return block.name, layout, errors, fallback
+
+
+def _take_shared_columns(name, layout):
+    """Copy a worker's columns out of its shared memory block, then unlink the block."""
+    block = SharedMemory(name=name)
+    try:
+        return {ticker: {header: np.ndarray((length,), dtype, buffer=block.buf, offset=offset).copy()
+                         for header, dtype, offset, length in entry}
+                for ticker, entry in layout.items()}
+    finally:
+        block.close()
+        block.unlink()
+
+
+def _read_sheets_in_workers(excel_file_path, tickers, workers):
+    """_read_sheet_columns with the sheets split over workers processes.
+
+    Each worker opens the workbook itself and returns its arrays through
+    shared memory rather than pickling them.
+    """
+    groups = [tickers[i::workers] for i in range(workers)]
+    parsed = {}
+    errors = {}
+    fallback = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(call_collected, _share_sheet_columns, excel_file_path, group) for group in groups]
+    # Every worker has finished here. Take back every block that was created
+    # before raising a failure, as the blocks are untracked and would outlive us
+    failure = None
+    for future in futures:
+        try:
+            (name, layout, group_errors, group_fallback), records = future.result()
+            add_records(records)
+            parsed.update(_take_shared_columns(name, layout))
+        except Exception as e:
+            failure = failure or e
+            continue
+        errors.update(group_errors)
+        fallback.extend(group_fallback)
+    if failure is not None:
+        raise failure
+    return parsed, errors, fallback
+
+
+def _parse_frames_in_workers(excel_file_path, tickers, engine, workers):
+    """parse_workbook_frames with the sheets split over workers processes."""
+    groups = [tickers[i::workers] for i in range(workers)]
+    frames = {}
+    errors = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(call_collected, parse_workbook_frames, excel_file_path, group, engine)
+                   for group in groups]
+        for future in futures:
+            (group_frames, group_errors), records = future.result()
+            add_records(records)
+            frames.update(group_frames)
+            errors.update(group_errors)
+    return {ticker: frames[ticker] for ticker in tickers if ticker in frames}, errors
+
+
+def read_workbook_frames(excel_file_path, tickers, reader=None, workers=1):
+    """Open a sector workbook once and normalize the sheet of every ticker.
+
+    reader (default XLSX_READER) is 'stream', 'calamine' or 'openpyxl'. The
+    stream reader fills NumPy arrays for the columns we keep straight from
+    each sheet's XML; sheets it cannot read exactly as pandas would, and
+    missing sheets, are parsed by pandas instead so the results and errors
+    are the same either way. With workers > 1 the sheets are split over that
+    many processes, whichever the reader.
+    """
+    if reader is None:
+        reader = XLSX_READER
+    workers = min(workers, len(tickers))
+    if reader != 'stream':
+        if workers > 1:
+            return _parse_frames_in_workers(excel_file_path, list(tickers), reader, workers)
+        return parse_workbook_frames(excel_file_path, tickers, engine=reader)
+
+    if workers > 1:
+        parsed, errors, fallback = _read_sheets_in_workers(excel_file_path, list(tickers), workers)
+    else:
+        parsed, errors, fallback = _read_sheet_columns(excel_file_path, tickers)
+    frames = {}
+    for ticker, columns in parsed.items():
+        try:
+            with stage('normalize', item=ticker):
+                frames[ticker] = columns_frame(columns)
+        except Exception:
+            fallback.append(ticker)
+    if fallback:
+        parsed, parse_errors = parse_workbook_frames(excel_file_path, fallback)
+        frames.update(parsed)
+        errors.update(parse_errors)
+    return {ticker: frames[ticker] for ticker in tickers if ticker in frames}, errors
+
+
+def read_company_sheets(excel_file_path, sectors):
+    """Open the company names workbook once and read the sheet of every sector."""
+    frames = {}
+    errors = {}
+    with pd.ExcelFile(excel_file_path) as xl:
+        for sector in sectors:
+            try:
+                frames[sector] = xl.parse(sheet_name=sector)
+            except Exception as e:
+                errors[sector] = e
+    return frames, errors
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_json(path, obj):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(obj, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def _cache_file_name(ticker):
+    extension = 'parquet' if CACHE_FORMAT == 'parquet' else 'pkl'
+    return f"{quote(str(ticker), safe='')}.{extension}"
+
+
+def _write_frame(df, path):
+    tmp_path = f"{path}.tmp"
+    if CACHE_FORMAT == 'parquet':
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _read_frame(path):
+    if CACHE_FORMAT == 'parquet':
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def _fresh_manifest(cache_dir, excel_file_path):
+    """Return the cache manifest if it still matches the workbook on disk and CACHE_SCHEMA, else a new empty one."""
+    stat = os.stat(excel_file_path)
+    manifest_path = os.path.join(cache_dir, 'manifest.json')
+    manifest = None
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    if (manifest is not None and manifest.get('schema') == CACHE_SCHEMA and manifest.get('format') == CACHE_FORMAT
+            and manifest.get('size') == stat.st_size):
+        if manifest.get('mtime_ns') == stat.st_mtime_ns:
+            return manifest
+        # Touched but possibly unchanged (e.g. copied back from a share): fall back to the content hash
+        if manifest.get('sha256') == _file_sha256(excel_file_path):
+            manifest['mtime_ns'] = stat.st_mtime_ns
+            _write_json(manifest_path, manifest)
+            return manifest
+
+    for name in os.listdir(cache_dir):
+        os.remove(os.path.join(cache_dir, name))
+    return {
+        'schema': CACHE_SCHEMA,
+        'format': CACHE_FORMAT,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': _file_sha256(excel_file_path),
+        'sheets': {},
+    }
+
+
+def _load_cached_sheets(excel_file_path, cache_dir, sheet_names, read_sheets):
+    """Read sheets through the columnar cache in cache_dir, parsing only those not cached yet.
+
+    The whole cache directory is dropped when the workbook's size, mtime and
+    content hash no longer match the manifest.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = _fresh_manifest(cache_dir, excel_file_path)
+
+    frames = {}
+    missing = [name for name in sheet_names if str(name) not in manifest['sheets']]
+    if missing:
+        parsed, parse_errors = read_sheets(excel_file_path, missing)
+        for name, df in parsed.items():
+            file_name = _cache_file_name(name)
+            try:
+                _write_frame(df, os.path.join(cache_dir, file_name))
+            except Exception as e:
+                print(f"Could not cache sheet {name}: {e}")
+                frames[name] = df
+                continue
+            manifest['sheets'][str(name)] = {'file': file_name}
+        for name, e in parse_errors.items():
+            manifest['sheets'][str(name)] = {'error': f"{type(e).__name__}: {e}"}
+        _write_json(os.path.join(cache_dir, 'manifest.json'), manifest)
+
+    errors = {}
+    for name in sheet_names:
+        if name in frames:
+            continue
+        entry = manifest['sheets'][str(name)]
+        if 'error' in entry:
+            errors[name] = ValueError(entry['error'])
+        else:
+            with stage('cache_read', item=name):
+                frames[name] = _read_frame(os.path.join(cache_dir, entry['file']))
+    return frames, errors
+
+
+def load_sector_frames(sector, tickers, data_dir='data', workers=1):
+    """Load normalized ticker frames through the columnar cache under data/.cache/<sector>/.
+
+    Sheets missing from the cache are parsed over workers processes.
+    """
+    excel_file_path = os.path.join(data_dir, f"{sector}.xlsx")
+    cache_dir = os.path.join(data_dir, CACHE_DIR_NAME, sector)
+    return _load_cached_sheets(excel_file_path, cache_dir, tickers, partial(read_workbook_frames, workers=workers))
+
+
+def list_sectors(data_dir='data'):
+    """Return the sector sheet names of Company Names.xlsx, remembered in the cache manifest."""
+    excel_file_path = os.path.join(data_dir, 'Company Names.xlsx')
+    cache_dir = os.path.join(data_dir, CACHE_DIR_NAME, 'Company Names')
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = _fresh_manifest(cache_dir, excel_file_path)
+    if 'sheet_names' not in manifest:
+        with pd.ExcelFile(excel_file_path) as xl:
+            manifest['sheet_names'] = list(xl.sheet_names)
+        _write_json(os.path.join(cache_dir, 'manifest.json'), manifest)
+    return manifest['sheet_names']
+
+
+def load_companies(sectors, data_dir='data'):
+    """Load several sectors' sheets of Company Names.xlsx through the columnar cache in one pass."""
+    excel_file_path = os.path.join(data_dir, 'Company Names.xlsx')
+    cache_dir = os.path.join(data_dir, CACHE_DIR_NAME, 'Company Names')
+    return _load_cached_sheets(excel_file_path, cache_dir, list(sectors), read_company_sheets)
+
+
+def load_company_names(sector, data_dir='data'):
+    """Load a sector's sheet of Company Names.xlsx through the columnar cache."""
+    frames, errors = load_companies([sector], data_dir)
+    if sector in errors:
+        raise errors[sector]
+    return frames[sector]
+
+
+def month_ordinal(month):
+    """Months since 1970-01 for a 'yyyy/mm' string."""
+    return int(np.datetime64(month.replace('/', '-'), 'M').astype(np.int64))
+
+
+def month_ordinals(dates):
+    """Months since 1970-01 of every date in a datetime Series or array."""
+    return np.asarray(dates, dtype='datetime64[ns]').astype('datetime64[M]').astype(np.int64)
+
+
+def month_slice(months, start_date, end_date):
+    """Slice of the sorted month ordinals months that falls within the yyyy/mm range start_date..end_date.
+
+    Either end may be None to leave the range open on that side.
+    """
+    start = 0 if start_date is None else np.searchsorted(months, month_ordinal(start_date), side='left')
+    end = len(months) if end_date is None else np.searchsorted(months, month_ordinal(end_date), side='right')
+    return slice(start, end)
+
+
+def slice_months(df, start_date, end_date, months=None):
+    """Rows of a normalized (date-sorted) frame within the yyyy/mm range, found by binary search.
+
+    months may pass the frame's precomputed month ordinals.
+    """
+    if months is None:
+        months = month_ordinals(df['Date'])
+    return df.iloc[month_slice(months, start_date, end_date)]
+
+
+class SectorPanel:
+    """A sector's ticker histories as dates x tickers arrays on one shared date axis.
+
+    dates is the sorted union of every ticker's dates and months holds their
+    month ordinals, so a yyyy/mm range is a binary-search slice. values maps
+    each metric read (PANEL_METRICS by default) to a dates x tickers array, NaN where a ticker
+    has no row or no value, and present marks which ticker has a row on which
+    date. A ticker with two rows on one date keeps the last.
+    """
+
+    def __init__(self, tickers, dates, values, present):
+        self.tickers = list(tickers)
+        self.position = {ticker: k for k, ticker in enumerate(self.tickers)}
+        self.dates = dates
+        self.months = month_ordinals(dates)
+        self.values = values
+        self.present = present
+
+    @classmethod
+    def from_frames(cls, frames, tickers, dtype=np.float64, metrics=PANEL_METRICS):
+        """Build a panel of metrics from normalized frames; tickers without a frame get no rows."""
+        loaded = [frames[ticker] for ticker in tickers if ticker in frames]
+        if loaded:
+            dates = np.unique(np.concatenate([df['Date'].to_numpy() for df in loaded]))
+        else:
+            dates = np.array([], dtype='datetime64[ns]')
+        values = {metric: np.full((len(dates), len(tickers)), np.nan, dtype=dtype) for metric in metrics}
+        present = np.zeros((len(dates), len(tickers)), dtype=bool)
+        for k, ticker in enumerate(tickers):
+            if ticker not in frames:
+                continue
+            df = frames[ticker]
+            df = df[~df['Date'].duplicated(keep='last')]
+            rows = np.searchsorted(dates, df['Date'].to_numpy())
+            present[rows, k] = True
+            for metric in metrics:
+                if metric in df.columns:
+                    values[metric][rows, k] = df[metric].to_numpy(dtype=dtype)
+        return cls(tickers, dates, values, present)
+
+    def month_rows(self, start_date, end_date):
+        """Slice of the rows dated within the yyyy/mm range start_date..end_date."""
+        return month_slice(self.months, start_date, end_date)
+
+    def window(self, start_date, end_date):
+        """A panel over the yyyy/mm range start_date..end_date that shares this panel's arrays."""
+        rows = self.month_rows(start_date, end_date)
+        return SectorPanel(self.tickers, self.dates[rows],
+                           {metric: array[rows] for metric, array in self.values.items()}, self.present[rows])
+
+    def rows(self, ticker):
+        """Boolean mask of the dates on which ticker has a row."""
+        return self.present[:, self.position[ticker]]
+
+    def series(self, ticker, metric):
+        """(dates, values) of metric for ticker over the dates it has rows."""
+        k = self.position[ticker]
+        rows = self.present[:, k]
+        return self.dates[rows], self.values[metric][rows, k]
+
+
+class SectorDataStore:
+    """Loads every ticker sheet of a sector workbook once and hands out normalized frames.
+
+    Each frame is sorted by date and its month ordinals are computed once, so
+    window() selects a date range with a binary search. load_workers splits
+    the parsing of the workbook's sheets over that many processes. metrics
+    and panel_range, a (start, end) yyyy/mm pair with None for an open end,
+    limit the panel to the metrics and months its readers need.
+    """
+
+    def __init__(self, sector, data_dir='data', companies=None, use_cache=True, load_workers=1,
+                 metrics=PANEL_METRICS, panel_range=(None, None)):
+        self.sector = sector
+        self.data_dir = data_dir
+        self.excel_file_path = os.path.join(data_dir, f"{sector}.xlsx")
+        if companies is None:
+            with stage('company_names_load', item=sector):
+                if use_cache:
+                    companies = load_company_names(sector, data_dir)
+                else:
+                    companies = pd.read_excel(os.path.join(data_dir, 'Company Names.xlsx'), sheet_name=sector)
+        self.companies = companies
+        self.tickers = companies['Ticker'].tolist()
+        with stage('workbook_load', item=sector):
+            if use_cache:
+                self.frames, self.errors = load_sector_frames(sector, self.tickers, data_dir, load_workers)
+            else:
+                self.frames, self.errors = read_workbook_frames(self.excel_file_path, self.tickers,
+                                                                workers=load_workers)
+        self.months = {ticker: month_ordinals(df['Date']) for ticker, df in self.frames.items()}
+        self.metrics = list(metrics)
+        self.panel_range = panel_range
+        self._panel = None
+
+    @property
+    def panel(self):
+        """SectorPanel of every ticker over panel_range, built on first use."""
+        if self._panel is None:
+            with stage('panel_build', item=self.sector):
+                start_date, end_date = self.panel_range
+                frames = {ticker: df.iloc[month_slice(self.months[ticker], start_date, end_date)]
+                          for ticker, df in self.frames.items()}
+                self._panel = SectorPanel.from_frames(frames, self.tickers, metrics=self.metrics)
+        return self._panel
+
+    def frame(self, ticker):
+        """Return a copy of the normalized frame for ticker, re-raising any load error."""
+        if ticker in self.errors:
+            raise self.errors[ticker]
+        return self.frames[ticker].copy()
+
+    def window(self, ticker, start_date, end_date):
+        """Return a copy of ticker's rows within the yyyy/mm range, re-raising any load error."""
+        if ticker in self.errors:
+            raise self.errors[ticker]
+        return slice_months(self.frames[ticker], start_date, end_date, self.months[ticker]).copy()
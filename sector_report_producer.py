@@ -1,24 +1,36 @@
-import tkinter as tk
-from tkinter import ttk, messagebox
-import pandas as pd
 import datetime
-import importlib.util
-import sys
+import argparse
+import json
+import time
+import copy
+import cProfile
+import io
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 import os
-from docx import Document
-from docx.shared import Inches
-from docx.oxml import OxmlElement
-from docx.oxml.ns import qn
-from collections import defaultdict
+from figure_store import DEFAULT_MAX_BYTES, DEFAULT_ROOT, FigureStore
+from sector_analysis import SECTIONS, SectionContext, data_needs, selected_sections
+from timing import add_records, call_collected, enable, labelled, record, stage, write_report
+
+# sector_data (and with it pandas), python-docx, Pillow and the section modules are imported where they
+# are used, so --help and small runs do not pay for what they do not need.
+REPORT_OPTIONS = [(section.label, section.key) for section in SECTIONS]
+
+def is_valid_month(value):
+    """True if value is a yyyy/mm string."""
+    return len(value) == 7 and value[4] == '/' and value[:4].isdigit() and value[5:7].isdigit()
 
 def select_sector_and_dates():
+    import tkinter as tk
+    from tkinter import ttk, messagebox
+    from sector_data import list_sectors
+
     root = tk.Tk()
     root.title("Select Sector and Date Range")
     root.geometry("400x250")
     root.resizable(False, False)
 
-    xl = pd.ExcelFile(os.path.join('data', 'Company Names.xlsx'))
-    sheet_names = xl.sheet_names
+    sheet_names = list_sectors()
 
     selected_sector = tk.StringVar()
     selected_sector.set(sheet_names[0])
@@ -28,10 +40,10 @@ def select_sector_and_dates():
     def on_ok():
         start = start_date_var.get()
         end = end_date_var.get()
-        if not (len(start) == 7 and start[4] == '/' and start[:4].isdigit() and start[5:7].isdigit()):
+        if not is_valid_month(start):
             messagebox.showwarning("Input Error", "Start date must be in yyyy/mm format.")
             return
-        if not (len(end) == 7 and end[4] == '/' and end[:4].isdigit() and end[5:7].isdigit()):
+        if not is_valid_month(end):
             messagebox.showwarning("Input Error", "End date must be in yyyy/mm format.")
             return
         if int(end[:4] + end[5:7]) < int(start[:4] + start[5:7]):
@@ -64,19 +76,15 @@ def select_sector_and_dates():
     return getattr(root, 'selected_sector', None), getattr(root, 'start_date', None), getattr(root, 'end_date', None)
 
 def select_report_options():
+    import tkinter as tk
+
     root = tk.Tk()
     root.title("Select Report Options")
-    root.geometry("350x220")
+    root.geometry("350x250")
     root.resizable(False, False)
 
-    options = [
-        ("Z-Score Matrix", "zscore"),
-        ("Earnings vs Dididend Plots", "earnings_dividend"),
-        ("Relative Graphs", "relative"),
-        ("Individual Analysis", "individual"),
-    ]
     vars = {}
-    for idx, (label, key) in enumerate(options):
+    for idx, (label, key) in enumerate(REPORT_OPTIONS):
         var = tk.BooleanVar()
         chk = tk.Checkbutton(root, text=label, variable=var)
         chk.pack(anchor='w', padx=30, pady=5)
@@ -92,8 +100,114 @@ def select_report_options():
     root.mainloop()
     return getattr(root, 'selected_options', {})
 
+PICTURE_WIDTH_INCHES = 6
+PICTURE_DPI = 150
+
+def add_report_picture(doc, image_path, compress=True):
+    """Add a chart at the report's 6-inch width.
+
+    With compress the PNG is first downscaled to PICTURE_DPI at that width and
+    reduced to a 256-colour palette, which keeps each embedded image (and the
+    document held in memory until it is saved) to roughly a third of the
+    rendered file's size.
+    """
+    from docx.shared import Inches
+    from PIL import Image
+
+    if not compress:
+        doc.add_picture(image_path, width=Inches(PICTURE_WIDTH_INCHES))
+        return
+    with Image.open(image_path) as image:
+        width = PICTURE_WIDTH_INCHES * PICTURE_DPI
+        if image.width > width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        image = image.convert('RGB').quantize(256, dither=Image.Dither.NONE)
+        stream = io.BytesIO()
+        image.save(stream, 'PNG', optimize=True)
+    stream.seek(0)
+    doc.add_picture(stream, width=Inches(PICTURE_WIDTH_INCHES))
+
+def add_report_item(doc, item, figures, compress=True):
+    """Add one item yielded by a section's content function to the document.
+
+    A picture's scratch render is released once it is embedded.
+    """
+    kind = item[0]
+    if kind == 'heading':
+        doc.add_heading(item[1], level=item[2])
+    elif kind == 'paragraph':
+        doc.add_paragraph(item[1])
+    elif kind == 'picture':
+        add_report_picture(doc, item[1], compress)
+        figures.release(item[1])
+    else:
+        raise ValueError(f"Unknown report item: {kind}")
+
+_section_context = None
+
+def _init_section_worker(context):
+    import matplotlib
+    matplotlib.use('Agg')
+    global _section_context
+    _section_context = context
+
+def _section_items(section):
+    # Runs in a section worker: the whole section is computed before its items go back.
+    # The worker labels its own records, as it may have been forked inside another section's label
+    with labelled(section=section.key):
+        with stage("module_import"):
+            content = section.load()
+        return list(content(_section_context))
+
+def concurrent_section_items(context, sections, section_workers):
+    """Yield (items, timing records) for each section in order, computing the sections concurrently.
+
+    Each of section_workers processes is handed context when it starts, with
+    the store's panel already built, so no worker reads the workbook again.
+    Charts are rendered into this process's scratch folder, so they are
+    embedded and released here as in a serial run.
+    """
+    context = copy.copy(context)
+    context.figures = context.figures.shared_run()
+    context.store.panel  # built once here rather than in every worker
+    with ProcessPoolExecutor(max_workers=section_workers, initializer=_init_section_worker,
+                             initargs=(context,)) as executor:
+        futures = [executor.submit(call_collected, _section_items, section) for section in sections]
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            # If the report fails part way, do not start the sections still queued
+            for future in futures:
+                future.cancel()
+
+PROGRESS_INTERVAL = 5.0
+
+def chart_progress(label):
+    """Progress callback for the chart sections.
+
+    Prints how many charts are done at most every PROGRESS_INTERVAL seconds
+    and once at the end, and records the time to the first chart.
+    """
+    started = time.perf_counter()
+    state = {'first': None, 'printed': started}
+
+    def progress(done, total):
+        now = time.perf_counter()
+        if state['first'] is None:
+            state['first'] = now - started
+            record("time_to_first_figure", state['first'])
+        if done == total or now - state['printed'] >= PROGRESS_INTERVAL:
+            state['printed'] = now
+            print(f"{label}: {done}/{total} charts, {now - started:.1f}s elapsed "
+                  f"(first after {state['first']:.1f}s)")
+    return progress
+
 def add_word_toc(doc):
     """Insert a Word TOC field code that will become a clickable TOC when opened in Word."""
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+
     paragraph = doc.add_paragraph()
     run = paragraph.add_run()
     fldChar = OxmlElement('w:fldChar')
@@ -110,20 +224,36 @@ def add_word_toc(doc):
     run._r.append(fldChar3)
     doc.add_page_break()
 
-if __name__ == "__main__":
-    sector, start_date, end_date = select_sector_and_dates()
-    selected_options = select_report_options()
-    print("Sector:", sector)
-    print("Start Date:", start_date)
-    print("End Date:", end_date)
-    print("Selected Options:", selected_options)
-    print("Generating report...")
+def build_report(sector, start_date, end_date, selected_options, workers=1, output_dir=None, companies=None,
+                 figures=None, relative_top_k=None, relative_unique_pairs=False, compress_images=True,
+                 rolling_window=None, load_workers=1, section_workers=1):
+    """Build the Word report for sector and return the path of the saved .docx.
+
+    figures is the FigureStore charts are rendered into (a default one under
+    data/.cache/figures when None); charts and z-score cells whose inputs are
+    unchanged since an earlier run are reused instead of recomputed. The
+    run's scratch renders are removed once the report is saved.
+    relative_top_k and relative_unique_pairs limit the relative section to the
+    most stretched pairs or to one orientation per pair. Relative and
+    individual charts are added to the document as they are rendered, and
+    with compress_images every chart is downscaled before embedding.
+    rolling_window overlays a rolling P/E z-score over that many months on
+    the relative and individual charts. load_workers processes parse the
+    sector workbook's uncached sheets. With section_workers > 1 the selected
+    sections are computed concurrently in that many processes and added to
+    the document in report order once they finish.
+    """
+    from docx import Document
+    from sector_data import SectorDataStore
 
     today_str = datetime.datetime.now().strftime("%d%m%Y")
-    output_dir = os.path.join(os.path.dirname(__file__), "Reports")
+    if output_dir is None:
+        output_dir = os.path.join(os.path.dirname(__file__), "Reports")
     os.makedirs(output_dir, exist_ok=True)
     doc_path = os.path.join(output_dir, f"{sector.lower()}_{today_str}.docx")
     doc = Document()
+    if figures is None:
+        figures = FigureStore()
 
     # --- Cover Page (Page 1) ---
     doc.add_heading(f"{sector} Report", 0)
@@ -135,81 +265,261 @@ if __name__ == "__main__":
     doc.add_heading("Table of Contents", level=1)
     add_word_toc(doc)  # This will be a clickable TOC after updating in Word
 
-    numerators = []
-    individual_tickers = []
+    # Parse the sector workbook once, building the panel only for the metrics
+    # and months the selected sections read, and share it between them
+    sections = selected_sections(selected_options)
+    settings = {'workers': workers, 'relative_top_k': relative_top_k,
+                'relative_unique_pairs': relative_unique_pairs, 'rolling_window': rolling_window}
+    store = None
+    if sections:
+        metrics, panel_range = data_needs(sections, start_date, end_date, settings)
+        store = SectorDataStore(sector, companies=companies, load_workers=load_workers,
+                                metrics=metrics, panel_range=panel_range)
+    context = SectionContext(sector, start_date, end_date, store, figures, settings, chart_progress)
 
     # --- Main Content ---
-    # 1. Comparative Z-Score Matrix
-    if selected_options.get("zscore"):
-        sector_analysis_dir = os.path.join(os.path.dirname(__file__), "Sector Analysis")
-        zscore_path = os.path.join(sector_analysis_dir, "sector_z-scorematrix.py")
-        spec = importlib.util.spec_from_file_location("sector_zscorematrix", zscore_path)
-        zscore_module = importlib.util.module_from_spec(spec)
-        sys.modules["sector_zscorematrix"] = zscore_module
-        spec.loader.exec_module(zscore_module)
-
-        heatmap_path = zscore_module.produce_zscore_matrix(sector, start_date, end_date)
-        doc.add_heading("1. Comparative Z-Score Matrix", level=1)
-        doc.add_picture(heatmap_path, width=Inches(6))
-        doc.add_paragraph(f"Date range: {start_date} to {end_date}")
-
-    # 2. Earnings vs Dividend Plots
-    if selected_options.get("earnings_dividend"):
-        sector_analysis_dir = os.path.join(os.path.dirname(__file__), "Sector Analysis")
-        earn_vs_div_path = os.path.join(sector_analysis_dir, "sector_earn_vs_div_plots.py")
-        spec = importlib.util.spec_from_file_location("sector_earn_vs_div_plots", earn_vs_div_path)
-        earn_vs_div_module = importlib.util.module_from_spec(spec)
-        sys.modules["sector_earn_vs_div_plots"] = earn_vs_div_module
-        spec.loader.exec_module(earn_vs_div_module)
-
-        plot1_path, plot2_path = earn_vs_div_module.produce_earnings_vs_div_plots(sector, start_date, end_date)
-        doc.add_heading("2. Earnings vs Dividend Plots", level=1)
-        doc.add_heading('2.1 Z-score P/E vs D/Y', level=2)
-        doc.add_picture(plot1_path, width=Inches(6))
-        doc.add_heading('2.2 Abs P/E vs Abs D/Y', level=2)
-        doc.add_picture(plot2_path, width=Inches(6))
-
-    # 3. Relative Analysis
-    if selected_options.get("relative"):
-        sector_analysis_dir = os.path.join(os.path.dirname(__file__), "Sector Analysis")
-        relative_figures_path = os.path.join(sector_analysis_dir, "sector_relative_figures.py")
-        spec = importlib.util.spec_from_file_location("sector_relative_figures", relative_figures_path)
-        relative_figures_module = importlib.util.module_from_spec(spec)
-        sys.modules["sector_relative_figures"] = relative_figures_module
-        spec.loader.exec_module(relative_figures_module)
-
-        plots = relative_figures_module.produce_relative_figures(sector, start_date, end_date)
-        grouped = defaultdict(list)
-        for pair_name, plot_path in plots:
-            numerator = pair_name.split(" / ")[0]
-            grouped[numerator].append((pair_name, plot_path))
-        numerators = list(grouped.keys())
-        doc.add_heading("3. Relative Analysis", level=1)
-        for idx, numerator in enumerate(numerators, 1):
-            doc.add_heading(f"3.{idx}. {numerator}", level=2)
-            for pair_name, plot_path in grouped[numerator]:
-                doc.add_heading(f"Relative Analysis: {pair_name}", level=3)
-                doc.add_picture(plot_path, width=Inches(6))
-
-    # 4. Individual Analysis
-    if selected_options.get("individual"):
-        sector_analysis_dir = os.path.join(os.path.dirname(__file__), "Sector Analysis")
-        individual_analysis_path = os.path.join(sector_analysis_dir, "sector_individual_analysis.py")
-        spec = importlib.util.spec_from_file_location("sector_individual_analysis", individual_analysis_path)
-        individual_analysis_module = importlib.util.module_from_spec(spec)
-        sys.modules["sector_individual_analysis"] = individual_analysis_module
-        spec.loader.exec_module(individual_analysis_module)
-
-        plots = individual_analysis_module.produce_individual_analysis(sector, start_date, end_date)
-        individual_tickers = [ticker for ticker, _ in plots]
-        doc.add_heading("4. Individual Analysis", level=1)
-        for idx, (ticker, plot_path) in enumerate(plots, 1):
-            doc.add_heading(f"4.{idx}. {ticker}", level=2)
-            doc.add_picture(plot_path, width=Inches(6))
-
-    doc.save(doc_path)
+    concurrent = min(section_workers, len(sections)) > 1
+    try:
+        if concurrent:
+            results = concurrent_section_items(context, sections, section_workers)
+        for section in sections:
+            with labelled(section=section.key):
+                if concurrent:
+                    items, records = next(results)
+                    add_records(records)
+                else:
+                    with stage("module_import"):
+                        content = section.load()
+                    items = content(context)
+                for item in items:
+                    with stage("docx_assembly"):
+                        add_report_item(doc, item, figures, compress_images)
+
+        with stage("docx_save"):
+            doc.save(doc_path)
+    finally:
+        if concurrent:
+            # Stops the section workers before their scratch folder goes
+            results.close()
+        figures.cleanup_run()
     print(f"Word report saved to {doc_path}")
+    return doc_path
+
+def _build_sector_report(job):
+    """Build one sector's report for build_batch, returning its summary entry instead of raising."""
+    sector = job['sector']
+    started = time.perf_counter()
+    try:
+        with labelled(sector=sector):
+            doc_path = build_report(sector, job['start_date'], job['end_date'], job['selected_options'],
+                                    workers=job['workers'], output_dir=job['output_dir'], companies=job['companies'],
+                                    figures=job['figures'], relative_top_k=job['relative_top_k'],
+                                    relative_unique_pairs=job['relative_unique_pairs'],
+                                    compress_images=job['compress_images'], rolling_window=job['rolling_window'],
+                                    load_workers=job['load_workers'], section_workers=job['section_workers'])
+        entry = {'sector': sector, 'status': 'ok', 'doc_path': doc_path}
+    except Exception as e:
+        print(f"Error processing sector {sector}: {e}")
+        entry = {'sector': sector, 'status': 'error', 'error': f"{type(e).__name__}: {e}"}
+    entry['seconds'] = round(time.perf_counter() - started, 3)
+    return entry
+
+def build_batch(sectors, start_date, end_date, selected_options, workers=1, sector_workers=1, output_dir=None,
+                figures=None, relative_top_k=None, relative_unique_pairs=False, compress_images=True,
+                rolling_window=None, load_workers=1, section_workers=1):
+    """Build one report per sector in a single run and write a JSON run summary next to them.
+
+    Company Names.xlsx is read once for every sector. With sector_workers > 1
+    the sectors are built concurrently in separate processes.
+    """
+    from sector_data import list_sectors, load_companies
+
+    started = time.perf_counter()
+    if output_dir is None:
+        output_dir = os.path.join(os.path.dirname(__file__), "Reports")
+    os.makedirs(output_dir, exist_ok=True)
+    if sectors is None:
+        sectors = list_sectors()
+    with stage("company_names_load"):
+        companies, company_errors = load_companies(sectors)
+    jobs = [{
+        'sector': sector,
+        'start_date': start_date,
+        'end_date': end_date,
+        'selected_options': selected_options,
+        'workers': workers,
+        'output_dir': output_dir,
+        'companies': companies[sector],
+        'figures': figures,
+        'relative_top_k': relative_top_k,
+        'relative_unique_pairs': relative_unique_pairs,
+        'compress_images': compress_images,
+        'rolling_window': rolling_window,
+        'load_workers': load_workers,
+        'section_workers': section_workers,
+    } for sector in sectors if sector in companies]
+
+    if sector_workers > 1:
+        built = []
+        with ProcessPoolExecutor(max_workers=sector_workers) as executor:
+            for entry, records in executor.map(partial(call_collected, _build_sector_report), jobs):
+                add_records(records)
+                built.append(entry)
+    else:
+        built = [_build_sector_report(job) for job in jobs]
+    built = {entry['sector']: entry for entry in built}
+    results = []
+    for sector in sectors:
+        if sector in company_errors:
+            print(f"Error processing sector {sector}: {company_errors[sector]}")
+            results.append({'sector': sector, 'status': 'error', 'error': str(company_errors[sector]), 'seconds': 0.0})
+        else:
+            results.append(built[sector])
+
+    summary = {
+        'start_date': start_date,
+        'end_date': end_date,
+        'selected_options': selected_options,
+        'sector_workers': sector_workers,
+        'total_seconds': round(time.perf_counter() - started, 3),
+        'sectors': results,
+    }
+    today_str = datetime.datetime.now().strftime("%d%m%Y")
+    summary_path = os.path.join(output_dir, f"batch_summary_{today_str}.json")
+    with open(summary_path, 'w') as f:
+        json.dump(summary, f, indent=2)
+
+    for entry in results:
+        print(f"{entry['sector']:<30} {entry['status']:<6} {entry['seconds']:>9.2f}s")
+    print(f"Batch finished in {summary['total_seconds']:.2f}s, summary saved to {summary_path}")
+    return summary
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Produce a Word report for a sector. Without --sector the sector, dates "
+                    "and sections are chosen in dialogs; with --sector the report is built headless.")
+    parser.add_argument("--sector", help="Sector sheet name in data/Company Names.xlsx")
+    parser.add_argument("--sectors", nargs="+", metavar="SECTOR", help="Build one report per listed sector in one run")
+    parser.add_argument("--all-sectors", action="store_true",
+                        help="Build one report for every sector sheet in data/Company Names.xlsx")
+    parser.add_argument("--sector-workers", type=int, default=1,
+                        help="Processes used to build sectors concurrently in batch mode (default: 1)")
+    parser.add_argument("--start", help="Start date (yyyy/mm)")
+    parser.add_argument("--end", help="End date (yyyy/mm)")
+    for label, key in REPORT_OPTIONS:
+        parser.add_argument(f"--{key.replace('_', '-')}", dest=key, action="store_true", help=f"Include {label}")
+    parser.add_argument("--all-sections", action="store_true", help="Include every section")
+    parser.add_argument("--output-dir", help="Folder for the .docx (default: Reports next to this script)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes used to render the relative and individual charts (default: 1, serial)")
+    parser.add_argument("--section-workers", type=int, default=1,
+                        help="Processes used to compute the selected sections concurrently (default: 1, one "
+                             "section after another)")
+    parser.add_argument("--load-workers", type=int, default=1,
+                        help="Processes used to parse the sheets of a sector workbook that are not cached yet "
+                             "(default: 1, serial)")
+    parser.add_argument("--no-figure-cache", action="store_true",
+                        help="Recompute every chart and z-score cell instead of reusing unchanged ones from earlier runs")
+    parser.add_argument("--figure-dir", default=DEFAULT_ROOT,
+                        help=f"Folder for the persistent figure store (default: {DEFAULT_ROOT})")
+    parser.add_argument("--figure-cache-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="Size the figure store is trimmed to after each run, least recently used first "
+                             "(default: %(default)s)")
+    parser.add_argument("--relative-top-k", type=int, metavar="K",
+                        help="Only chart the K pairs with the most stretched relative P/E z-score")
+    parser.add_argument("--relative-unique-pairs", action="store_true",
+                        help="Chart one orientation per pair (the rich numerator) instead of both A/B and B/A")
+    parser.add_argument("--rolling-window", type=int, metavar="MONTHS",
+                        help="Overlay the rolling P/E z-score over MONTHS months on the relative and individual charts")
+    parser.add_argument("--full-resolution-images", action="store_true",
+                        help=f"Embed charts as rendered instead of downscaling them to {PICTURE_DPI} dpi at "
+                             f"{PICTURE_WIDTH_INCHES} inches")
+    parser.add_argument("--timing-report", metavar="PATH",
+                        help="Write per-stage, per-section and per-chart timings as JSON to PATH")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="Run under cProfile and dump the stats to PATH (open with pstats or snakeviz)")
+    args = parser.parse_args(argv)
+
+    if args.relative_top_k is not None and args.relative_top_k < 1:
+        parser.error("--relative-top-k must be at least 1")
+    if args.rolling_window is not None and args.rolling_window < 2:
+        parser.error("--rolling-window must be at least 2")
+    if sum([args.sector is not None, args.sectors is not None, args.all_sectors]) > 1:
+        parser.error("use only one of --sector, --sectors and --all-sectors")
+    if args.sector is not None or args.sectors is not None or args.all_sectors:
+        if args.start is None or args.end is None:
+            parser.error("--start and --end are required in headless mode")
+        for name in ("start", "end"):
+            if not is_valid_month(getattr(args, name)):
+                parser.error(f"--{name} must be in yyyy/mm format")
+        if int(args.end[:4] + args.end[5:7]) < int(args.start[:4] + args.start[5:7]):
+            parser.error("--end must not be before --start")
+    return args
 
-    # Inform the user with a popup window
-    tk.Tk().withdraw()  # Hide the root window
-    messagebox.showinfo("Report Generated", "Report generated successfully.")
\ No newline at end of file
+def main(argv=None):
+    args = parse_args(argv)
+    if args.timing_report:
+        enable()
+    profiler = None
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    started = time.perf_counter()
+    try:
+        return _run(args)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            print(f"Profile saved to {args.profile}")
+        if args.timing_report:
+            write_report(args.timing_report, time.perf_counter() - started)
+            print(f"Timing report saved to {args.timing_report}")
+
+def _run(args):
+    figures = FigureStore(args.figure_dir, args.figure_cache_mb * 1024 * 1024, reuse=not args.no_figure_cache)
+    if args.sectors is not None or args.all_sectors:
+        selected_options = {key: args.all_sections or getattr(args, key) for _, key in REPORT_OPTIONS}
+        summary = build_batch(args.sectors, args.start, args.end, selected_options, workers=args.workers,
+                              sector_workers=args.sector_workers, output_dir=args.output_dir, figures=figures,
+                              relative_top_k=args.relative_top_k, relative_unique_pairs=args.relative_unique_pairs,
+                              compress_images=not args.full_resolution_images, rolling_window=args.rolling_window,
+                              load_workers=args.load_workers, section_workers=args.section_workers)
+        figures.evict()
+        return summary
+
+    headless = args.sector is not None
+
+    if headless:
+        sector, start_date, end_date = args.sector, args.start, args.end
+        selected_options = {key: args.all_sections or getattr(args, key) for _, key in REPORT_OPTIONS}
+    else:
+        sector, start_date, end_date = select_sector_and_dates()
+        if sector is None:
+            raise SystemExit("No sector or date range selected. Exiting.")
+        selected_options = select_report_options()
+    print("Sector:", sector)
+    print("Start Date:", start_date)
+    print("End Date:", end_date)
+    print("Selected Options:", selected_options)
+    print("Generating report...")
+
+    with labelled(sector=sector):
+        doc_path = build_report(sector, start_date, end_date, selected_options,
+                                workers=args.workers, output_dir=args.output_dir, figures=figures,
+                                relative_top_k=args.relative_top_k, relative_unique_pairs=args.relative_unique_pairs,
+                                compress_images=not args.full_resolution_images, rolling_window=args.rolling_window,
+                                load_workers=args.load_workers, section_workers=args.section_workers)
+    figures.evict()
+
+    if not headless:
+        import tkinter as tk
+        from tkinter import messagebox
+
+        # Inform the user with a popup window
+        tk.Tk().withdraw()  # Hide the root window
+        messagebox.showinfo("Report Generated", "Report generated successfully.")
+    return doc_path
+
+if __name__ == "__main__":
+    main()
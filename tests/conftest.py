@@ -0,0 +1,6 @@
+import os
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The modules live at the repo root and the synthetic data generator in Benchmarks
+sys.path[:0] = [REPO_DIR, os.path.join(REPO_DIR, 'Benchmarks')]
@@ -0,0 +1,73 @@
+import os
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+from sector_data import HEADER_ROW, _read_sheet_columns, read_workbook_frames
+from synthetic_data import make_synthetic_data, ticker_names
+from xlsx_reader import XlsxWorkbook
+
+SECTOR = 'Synthetic'
+
+
+@pytest.fixture(scope='module')
+def workbook(tmp_path_factory):
+    """A synthetic sector workbook with sheets the stream reader must hand to pandas.
+
+    Returns (path, tickers, odd) where tickers includes a missing sheet and
+    odd lists the tickers whose sheets were edited.
+    """
+    data_dir = str(tmp_path_factory.mktemp('data'))
+    make_synthetic_data(data_dir, (SECTOR,), n_tickers=8, n_months=36)
+    path = os.path.join(data_dir, f"{SECTOR}.xlsx")
+    tickers = ticker_names(SECTOR, 8)
+    wb = load_workbook(path)
+    first_data_row = HEADER_ROW + 2
+    # A blank row in the preamble above the header
+    wb[tickers[1]].cell(row=2, column=1).value = None
+    # A formula cell, which has no cached value when written by openpyxl
+    wb[tickers[2]].cell(row=first_data_row + 3, column=4).value = f"=B{first_data_row + 3}/C{first_data_row + 3}"
+    # A number stored as text
+    wb[tickers[3]].cell(row=first_data_row + 5, column=4).value = '12.5'
+    # Text that is not a number, which pandas reads as NaN
+    wb[tickers[4]].cell(row=first_data_row + 1, column=2).value = 'n/a'
+    wb.save(path)
+    return path, tickers + ['MISSING'], tickers[1:5]
+
+
+def assert_same_frames(result, expected):
+    frames, errors = result
+    expected_frames, expected_errors = expected
+    assert list(frames) == list(expected_frames)
+    for ticker, frame in expected_frames.items():
+        pd.testing.assert_frame_equal(frames[ticker], frame, check_dtype=False)
+    assert {t: type(e) for t, e in errors.items()} == {t: type(e) for t, e in expected_errors.items()}
+
+
+def test_odd_sheets_fall_back_to_pandas(workbook):
+    path, tickers, odd = workbook
+    parsed, errors, fallback = _read_sheet_columns(path, tickers)
+    assert not errors
+    assert set(fallback) == set(odd[:3]) | {'MISSING'}
+    assert odd[3] in parsed
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_stream_reader_matches_openpyxl(workbook, workers):
+    path, tickers, _ = workbook
+    expected = read_workbook_frames(path, tickers, reader='openpyxl')
+    assert 'MISSING' in expected[1]
+    assert_same_frames(read_workbook_frames(path, tickers, reader='stream', workers=workers), expected)
+
+
+def test_stream_reader_failures_fall_back_to_pandas(workbook, monkeypatch):
+    path, tickers, _ = workbook
+    read_columns = XlsxWorkbook.read_columns
+
+    def failing(self, sheet_name, *args, **kwargs):
+        if sheet_name == tickers[0]:
+            raise ValueError("reader bug")
+        return read_columns(self, sheet_name, *args, **kwargs)
+
+    monkeypatch.setattr(XlsxWorkbook, 'read_columns', failing)
+    expected = read_workbook_frames(path, tickers, reader='openpyxl')
+    assert_same_frames(read_workbook_frames(path, tickers, reader='stream'), expected)
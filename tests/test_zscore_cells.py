@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+from figure_store import FigureStore
+from sector_analysis.sector_zscorematrix import compute_zscore_cells, zscore_cell_history, zscore_history
+from sector_data import SectorPanel
+from zscore_engine import window_zscore_stack
+
+
+def test_stored_cells_match_a_recompute_for_identical_tickers(tmp_path):
+    rng = np.random.default_rng(5)
+    dates = pd.date_range('2020-01-31', periods=24, freq='ME').values
+    pe = rng.lognormal(2.5, 0.4, 24)
+    # Two tickers with the same P/E slice, e.g. share classes, and a third one
+    values = np.column_stack([pe, pe, rng.lognormal(2.5, 0.4, 24)])
+    present = np.ones(values.shape, dtype=bool)
+    figures = FigureStore(str(tmp_path))
+    slot = figures.slot('Sector', 'zscore', 'cells', '2020/01', '2021/12')
+
+    cold = compute_zscore_cells(dates, values, present, figures, slot)
+    warm = compute_zscore_cells(dates, values, present, figures, slot)
+    np.testing.assert_array_equal(cold, warm)
+    assert not np.isnan(cold[0, 0]) and np.isnan(cold[0, 1])
+
+
+def test_history_keeps_one_matrix_per_month(tmp_path):
+    rng = np.random.default_rng(9)
+    tickers = ['A', 'B', 'C']
+    month_starts = pd.date_range('2020-01-01', periods=24, freq='MS')
+    # A and C report on the 5th of each month and B a week later
+    dates = np.sort(np.concatenate([(month_starts + pd.Timedelta(days=4)).values,
+                                    (month_starts + pd.Timedelta(days=11)).values]))
+    pe = rng.lognormal(2.5, 0.4, (len(dates), 3))
+    present = np.zeros(pe.shape, dtype=bool)
+    present[0::2, [0, 2]] = True
+    present[1::2, 1] = True
+    store = SimpleNamespace(tickers=tickers, panel=SectorPanel(tickers, dates, {'P/E': pe}, present))
+
+    history = zscore_history(store, '2020/01', '2020/12')
+    assert len(history.dates) == 12
+    history = zscore_history(store, '2020/01', '2021/12', history)
+    np.testing.assert_array_equal(history.dates, dates[1::2])
+    expected = window_zscore_stack(pe, present, [(0, stop) for stop in range(2, len(dates) + 1, 2)])
+    np.testing.assert_allclose(history.matrices, expected, rtol=1e-9, atol=1e-9)
+    cell = zscore_cell_history(history, tickers, 'A', 'C')
+    np.testing.assert_array_equal(cell.to_numpy(), np.round(history.matrices[:, 0, 2], 2))
@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sector_data import month_ordinals
+from zscore_engine import (ZScoreMatrixHistory, relative_zscore_matrix, rolling_pair_zscores, rolling_zscores,
+                           window_zscore_stack)
+
+
+def reference_matrix(dates, values, present, constant_nan=False):
+    """The comparative z-score matrix cell by cell, as the original pandas loop computed it.
+
+    With constant_nan a constant ratio series gives NaN rather than a z-score
+    of pandas' rounding noise, as in the sum-based window and history engines.
+    """
+    n_tickers = values.shape[1]
+    series = [pd.Series(values[present[:, k], k], index=dates[present[:, k]]) for k in range(n_tickers)]
+    matrix = np.full((n_tickers, n_tickers), np.nan)
+    for i in range(n_tickers):
+        for j in range(n_tickers):
+            if i == j:
+                ratio = series[i]
+            else:
+                ratio = series[i].div(series[j]).fillna(0.01)
+            if ratio.empty:
+                continue
+            std = ratio.std()
+            if constant_nan and ratio.min() == ratio.max():
+                continue
+            if std != 0:
+                matrix[i, j] = (ratio.iloc[-1] - ratio.mean()) / std
+    return matrix
+
+
+@pytest.fixture
+def panel():
+    """Monthly P/E of six tickers with staggered starts, gaps and NaN values."""
+    rng = np.random.default_rng(3)
+    n_dates, n_tickers = 48, 6
+    dates = pd.date_range('2020-01-31', periods=n_dates, freq='ME').values
+    values = rng.lognormal(2.5, 0.4, (n_dates, n_tickers))
+    present = rng.random((n_dates, n_tickers)) > 0.15
+    present[:20, 1] = False  # starts late
+    present[30:, 4] = False  # stops early
+    present[:, 5] = False
+    present[[10, 25], 5] = True  # only two rows
+    values[rng.random((n_dates, n_tickers)) < 0.08] = np.nan
+    return dates, values, present
+
+
+def reference_rolling(data, valid, window, min_periods=None):
+    """Rolling z-score of each column from pandas' own rolling mean and std over the valid values."""
+    if min_periods is None:
+        min_periods = window // 2
+    result = np.full(data.shape, np.nan)
+    for k in range(data.shape[1]):
+        keep = valid[:, k] & np.isfinite(data[:, k])
+        series = pd.Series(np.where(keep, data[:, k], np.nan))
+        rolling = series.rolling(window, min_periods=max(min_periods, 2))
+        std = rolling.std()
+        z = (series - rolling.mean()) / std
+        result[:, k] = np.where(keep & (std != 0), z, np.nan)
+    return result
+
+
+def assert_matches(result, expected):
+    np.testing.assert_allclose(result, expected, rtol=1e-9, atol=1e-9)
+
+
+def test_full_matrix(panel):
+    dates, values, present = panel
+    assert_matches(relative_zscore_matrix(values, present), reference_matrix(dates, values, present))
+
+
+def test_row_and_column_subsets(panel):
+    dates, values, present = panel
+    expected = reference_matrix(dates, values, present)
+    rows, cols = [0, 2, 5], [1, 2, 3, 4]
+    assert_matches(relative_zscore_matrix(values, present, rows=rows, cols=cols), expected[np.ix_(rows, cols)])
+    assert_matches(relative_zscore_matrix(values, present, rows=[4]), expected[[4]])
+
+
+def test_window_stack(panel):
+    dates, values, present = panel
+    windows = [(0, 48), (0, 12), (10, 40), (36, 48), (47, 48)]
+    stack = window_zscore_stack(values, present, windows)
+    for matrix, (start, stop) in zip(stack, windows):
+        rows = slice(start, stop)
+        assert_matches(matrix, reference_matrix(dates[rows], values[rows], present[rows], constant_nan=True))
+
+
+def test_history_prefixes(panel):
+    dates, values, present = panel
+    history = ZScoreMatrixHistory(values.shape[1])
+    history.extend(dates, values, present)
+    for t in range(len(dates)):
+        rows = slice(0, t + 1)
+        expected = reference_matrix(dates[rows], values[rows], present[rows], constant_nan=True)
+        assert_matches(history.matrices[t], expected)
+
+
+@pytest.mark.parametrize('min_periods', [None, 3, 12])
+def test_rolling(panel, min_periods):
+    _, values, present = panel
+    assert_matches(rolling_zscores(values, present, 12, min_periods), reference_rolling(values, present, 12, min_periods))
+
+
+def test_rolling_pairs(panel):
+    _, values, present = panel
+    left, right = [0, 1, 2, 3, 4], [1, 0, 3, 5, 2]
+    ratio = values[:, left] / values[:, right]
+    assert_matches(rolling_pair_zscores(values, present, left, right, 12),
+                   reference_rolling(ratio, present[:, left] & present[:, right], 12))
+
+
+def test_rolling_months_with_staggered_report_days():
+    """Tickers 0 and 2 report on the 5th of each month and ticker 1 a week later.
+
+    The panel then holds two rows per month, and a window of 12 months must
+    still hold each ticker's last 12 monthly values, not its last 6.
+    """
+    rng = np.random.default_rng(7)
+    n_months = 36
+    month_starts = pd.date_range('2020-01-01', periods=n_months, freq='MS')
+    dates = np.sort(np.concatenate([(month_starts + pd.Timedelta(days=4)).values,
+                                    (month_starts + pd.Timedelta(days=11)).values]))
+    values = rng.lognormal(2.5, 0.4, (len(dates), 3))
+    present = np.zeros(values.shape, dtype=bool)
+    present[0::2, [0, 2]] = True
+    present[1::2, 1] = True
+    months = month_ordinals(dates)
+
+    z = rolling_zscores(values, present, 12, months=months)
+    for k in range(3):
+        rows = present[:, k]
+        assert_matches(z[rows, k], reference_rolling(values[rows, k:k + 1], present[rows, k:k + 1], 12)[:, 0])
+        assert np.isnan(z[~rows, k]).all()
+
+    pairs = rolling_pair_zscores(values, present, [0, 0], [2, 1], 12, months=months)
+    rows = present[:, 0]
+    ratio = values[rows, 0] / values[rows, 2]
+    assert_matches(pairs[rows, 0], reference_rolling(ratio[:, None], np.ones((rows.sum(), 1), dtype=bool), 12)[:, 0])
+    # Tickers 0 and 1 never report on the same day
+    assert np.isnan(pairs[:, 1]).all()
@@ -0,0 +1,102 @@
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Timing records of the current process; None while collection is off, which
+# keeps stage() a near no-op in normal runs.
+_records = None
+_labels = {}
+
+
+def enable():
+    """Start collecting stage timings in this process."""
+    global _records
+    if _records is None:
+        _records = []
+
+
+def is_enabled():
+    return _records is not None
+
+
+@contextmanager
+def stage(name, **labels):
+    """Time the enclosed block as stage name, tagged with labels such as item=ticker."""
+    if _records is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _records.append(dict(_labels, stage=name, seconds=time.perf_counter() - started, **labels))
+
+
+def record(name, seconds, **labels):
+    """Record a duration measured by the caller, such as the time to the first chart."""
+    if _records is not None:
+        _records.append(dict(_labels, stage=name, seconds=seconds, **labels))
+
+
+@contextmanager
+def labelled(**labels):
+    """Tag every stage recorded in the enclosed block with labels, e.g. sector=... or section=..."""
+    global _labels
+    saved = _labels
+    _labels = dict(saved, **labels)
+    try:
+        yield
+    finally:
+        _labels = saved
+
+
+def add_records(records):
+    """Merge records collected in a worker process, tagging them with the current labels."""
+    if _records is not None:
+        _records.extend(dict(_labels, **record) for record in records)
+
+
+def call_collected(function, *args):
+    """Call function with collection on and return (result, records it produced).
+
+    Used to bring timings back from process pool workers, which do not share
+    this module's state with the parent.
+    """
+    global _records
+    saved = _records
+    _records = []
+    try:
+        result = function(*args)
+        return result, _records
+    finally:
+        _records = saved
+
+
+def report(total_seconds=None):
+    """Summarise the collected records as a JSON-serialisable dict.
+
+    Stages nest (a render includes its PNG encoding), so the per-stage totals
+    overlap and do not add up to total_seconds.
+    """
+    records = _records or []
+    stages = defaultdict(lambda: {'count': 0, 'seconds': 0.0})
+    sections = defaultdict(lambda: defaultdict(float))
+    for record in records:
+        stages[record['stage']]['count'] += 1
+        stages[record['stage']]['seconds'] += record['seconds']
+        if 'section' in record:
+            sections[record['section']][record['stage']] += record['seconds']
+    return {
+        'total_seconds': None if total_seconds is None else round(total_seconds, 4),
+        'stages': {name: {'count': entry['count'], 'seconds': round(entry['seconds'], 4)}
+                   for name, entry in sorted(stages.items(), key=lambda item: -item[1]['seconds'])},
+        'sections': {section: {name: round(seconds, 4) for name, seconds in totals.items()}
+                     for section, totals in sections.items()},
+        'records': [dict(record, seconds=round(record['seconds'], 6)) for record in records],
+    }
+
+
+def write_report(path, total_seconds=None):
+    with open(path, 'w') as f:
+        json.dump(report(total_seconds), f, indent=2)
@@ -0,0 +1,282 @@
+import html
+import posixpath
+import re
+import zipfile
+import numpy as np
+from xml.etree.ElementTree import iterparse
+
+MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+PACKAGE_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+TEXT_TAG = f'{MAIN_NS}t'
+# Rows allocated up front when a sheet has no <dimension>; the arrays grow as needed
+DEFAULT_ROWS = 512
+# Decompressed sheet XML is scanned this many bytes at a time
+CHUNK_BYTES = 1 << 20
+# A cell as written by Excel and openpyxl: reference first, then the style and
+# type, then either a lone <v> value (captured on its own) or any other content
+CELL = re.compile(rb'<(?:\w+:)?c r="([A-Z]+)(\d+)"(?: s="(\d+)")?(?: t="(\w+)")?([^>]*?)'
+                  rb'(?:/>|>(?:<(?:\w+:)?v>([^<]*)</(?:\w+:)?v>|(.*?))</(?:\w+:)?c>)', re.S)
+CELL_START = re.compile(rb'<(?:\w+:)?c[\s/>]')
+VALUE = re.compile(rb'<(?:\w+:)?v>([^<]*)</(?:\w+:)?v>')
+TEXT = re.compile(rb'<(?:\w+:)?t(?:\s[^>]*)?>([^<]*)</(?:\w+:)?t>')
+DIMENSION = re.compile(rb'<(?:\w+:)?dimension ref="[A-Z]*\d*:?[A-Z]*(\d+)"')
+
+
+class UnsupportedSheet(Exception):
+    """A sheet this reader cannot read exactly as pandas would; parse it with pandas instead."""
+
+
+def _text(element):
+    # Shared and inline strings may be split over several rich-text runs
+    return ''.join(t.text or '' for t in element.iter(TEXT_TAG))
+
+
+class XlsxWorkbook:
+    """An xlsx archive opened once for reading many sheets.
+
+    The sheet index, shared strings and date styles are parsed when the
+    workbook is opened. Each sheet's XML is then streamed in chunks and its
+    cells matched with a regular expression straight into NumPy arrays,
+    skipping openpyxl's cell objects and pandas' per-sheet parsing.
+    """
+
+    def __init__(self, path):
+        self.archive = zipfile.ZipFile(path)
+        try:
+            self.sheets = self._read_sheet_paths()
+            self.shared_strings = self._read_shared_strings()
+            self.date_styles = self._read_date_styles()
+        except Exception:
+            self.archive.close()
+            raise
+
+    def close(self):
+        self.archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _read_sheet_paths(self):
+        targets = {}
+        rels_path = 'xl/_rels/workbook.xml.rels'
+        with self.archive.open(rels_path) as f:
+            for _, element in iterparse(f):
+                if element.tag == f'{PACKAGE_REL_NS}Relationship':
+                    target = element.get('Target')
+                    if target.startswith('/'):
+                        target = target[1:]
+                    else:
+                        target = posixpath.normpath(posixpath.join('xl', target))
+                    targets[element.get('Id')] = target
+        sheets = {}
+        self.date1904 = False
+        with self.archive.open('xl/workbook.xml') as f:
+            for _, element in iterparse(f):
+                if element.tag == f'{MAIN_NS}sheet':
+                    sheets[element.get('name')] = targets[element.get(f'{REL_NS}id')]
+                elif element.tag == f'{MAIN_NS}workbookPr':
+                    self.date1904 = element.get('date1904') in ('1', 'true')
+        return sheets
+
+    def _read_shared_strings(self):
+        if 'xl/sharedStrings.xml' not in self.archive.namelist():
+            return []
+        strings = []
+        with self.archive.open('xl/sharedStrings.xml') as f:
+            for _, element in iterparse(f):
+                if element.tag == f'{MAIN_NS}si':
+                    strings.append(_text(element))
+                    element.clear()
+        return strings
+
+    def _read_date_styles(self):
+        """Indices of the cell formats that make openpyxl read a number as a date."""
+        # Imported here so runs served from the frame cache never load openpyxl
+        from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format
+
+        if 'xl/styles.xml' not in self.archive.namelist():
+            return set()
+        formats = dict(BUILTIN_FORMATS)
+        cell_formats = []
+        with self.archive.open('xl/styles.xml') as f:
+            in_cell_xfs = False
+            for event, element in iterparse(f, events=('start', 'end')):
+                if element.tag == f'{MAIN_NS}numFmt' and event == 'end':
+                    formats[int(element.get('numFmtId'))] = element.get('formatCode')
+                elif element.tag == f'{MAIN_NS}cellXfs':
+                    in_cell_xfs = event == 'start'
+                elif element.tag == f'{MAIN_NS}xf' and event == 'end' and in_cell_xfs:
+                    cell_formats.append(int(element.get('numFmtId', 0)))
+        return {index for index, format_id in enumerate(cell_formats)
+                if format_id in formats and is_date_format(formats[format_id])}
+
+    def read_columns(self, sheet_name, header_row, names, date_names=()):
+        """Stream one sheet and return {header: array} for each header in names found on header_row.
+
+        header_row is 0-based, as pandas' header argument; the first cell with a
+        given header wins. Values are written into preallocated float arrays as
+        the chunks stream past, and columns headed by one of date_names come
+        back as datetime64[us] (NaT where blank). Raises KeyError for a missing
+        sheet and UnsupportedSheet for layouts whose pandas reading this does
+        not reproduce, such as blank rows above the header or dates stored as
+        text.
+        """
+        scan = _SheetScan(self, header_row + 1, names, date_names)
+        with self.archive.open(self.sheets[sheet_name]) as f:
+            pending = b''
+            for chunk in iter(lambda: f.read(CHUNK_BYTES), b''):
+                data = pending + chunk
+                if scan.capacity is None:
+                    match = DIMENSION.search(data, 0, 4096)
+                    scan.allocate(int(match.group(1)) if match else DEFAULT_ROWS)
+                # Only scan up to the last row tag so no cell is split between chunks
+                cut = data.rfind(b'row>')
+                cut = 0 if cut < 0 else cut + 4
+                scan.feed(data[:cut])
+                pending = data[cut:]
+            if scan.capacity is None:
+                scan.allocate(DEFAULT_ROWS)
+            scan.feed(pending)
+        return scan.result(sheet_name)
+
+    def cell_text(self, kind, inner):
+        """Text of a cell's contents as openpyxl would read it for a header."""
+        if kind == b'inlineStr':
+            return html.unescape(b''.join(TEXT.findall(inner)).decode('utf-8'))
+        value = VALUE.search(inner)
+        if value is None:
+            return None
+        if kind == b's':
+            return self.shared_strings[int(value.group(1))]
+        return html.unescape(value.group(1).decode('utf-8'))
+
+    def to_datetime(self, serials):
+        """Excel serial day numbers as datetime64[us], as openpyxl converts them."""
+        if self.date1904:
+            epoch = np.datetime64('1904-01-01', 'us')
+        else:
+            # Serial 60 is the phantom 1900-02-29; openpyxl shifts the dates before it
+            if (serials < 61).any():
+                raise UnsupportedSheet("dates before March 1900")
+            epoch = np.datetime64('1899-12-30', 'us')
+        valid = ~np.isnan(serials)
+        micros = np.round(np.where(valid, serials, 0.0) * 86_400_000_000).astype(np.int64)
+        dates = epoch + micros.astype('timedelta64[us]')
+        dates[~valid] = np.datetime64('NaT')
+        return dates
+
+
+class _SheetScan:
+    """State of one read_columns call while its sheet's chunks are scanned."""
+
+    def __init__(self, workbook, header_line, names, date_names):
+        self.workbook = workbook
+        self.header_line = header_line
+        self.names = names
+        self.date_names = date_names
+        self.filled_rows = set()
+        self.header = {}
+        self.columns = None
+        self.arrays = {}
+        self.capacity = None
+        self.filled = 0
+
+    def allocate(self, n_rows):
+        self.capacity = max(n_rows - self.header_line, 1)
+
+    def feed(self, data):
+        cells = CELL.findall(data)
+        # Counting plain <c tags is cheap; the full count is only needed for prefixed tags
+        if len(cells) != data.count(b'<c ') + data.count(b'<c>') and len(cells) != len(CELL_START.findall(data)):
+            raise UnsupportedSheet("cells laid out differently from Excel's")
+        if not cells:
+            return
+        letters, rows, styles, kinds, rests, values, others = zip(*cells)
+        if b's="' in b''.join(rests) or b't="' in b''.join(rests):
+            raise UnsupportedSheet("cell attributes in an unexpected order")
+        rows = np.array(rows).astype(np.int64)
+        head = rows <= self.header_line
+        for i in np.flatnonzero(head):
+            inner = b'<v>' + values[i] + b'</v>' if values[i] else others[i]
+            self._read_header_cell(letters[i], rows[i], kinds[i], inner)
+        if head.all():
+            return
+        if self.columns is None:
+            if self.header_line not in self.filled_rows:
+                raise UnsupportedSheet("no header row")
+            self._start_data()
+
+        letters = np.array(letters)
+        styles = np.array([int(style or 0) for style in styles])
+        kinds = np.array(kinds)
+        values = np.array(values)
+        others = np.array(others)
+        for column, name in self.columns.items():
+            cells = np.flatnonzero(~head & (letters == column))
+            is_date = name in self.date_names
+            numeric = np.isin(kinds[cells], (b'', b'n')) & (others[cells] == b'')
+            for i in cells[~numeric]:
+                self._check_other_cell(name, is_date, kinds[i], others[i])
+            cells = cells[numeric & (values[cells] != b'')]
+            if not len(cells):
+                continue
+            if (np.isin(styles[cells], list(self.workbook.date_styles)) != is_date).any():
+                raise UnsupportedSheet(f"number formatted unlike its column in {name}")
+            index = rows[cells] - self.header_line - 1
+            needed = index.max() + 1
+            if needed > self.capacity:
+                self.capacity = max(self.capacity * 2, needed)
+                for key, array in self.arrays.items():
+                    self.arrays[key] = np.concatenate([array, np.full(self.capacity - len(array), np.nan)])
+            self.arrays[column][index] = values[cells].astype(float)
+            self.filled = max(self.filled, needed)
+
+    def _check_other_cell(self, name, is_date, kind, inner):
+        """Skip a cell pandas would read as NaN; raise UnsupportedSheet for any other non-numeric cell."""
+        if kind in (b'', b'n'):
+            # A number with a formula or other markup next to its value
+            if VALUE.search(inner) is None:
+                return
+        elif kind == b'e' and not is_date:
+            # Error cells such as #N/A come through pandas as text, then NaN
+            return
+        elif kind in (b's', b'str', b'inlineStr') and not is_date:
+            try:
+                float(self.workbook.cell_text(kind, inner))
+            except (TypeError, ValueError):
+                return
+            raise UnsupportedSheet(f"number stored as text in {name}")
+        raise UnsupportedSheet(f"{kind.decode() or 'n'} cell in {name}")
+
+    def _read_header_cell(self, letters, row, kind, inner):
+        text = self.workbook.cell_text(kind, inner) if inner else None
+        if text is not None:
+            self.filled_rows.add(row)
+        if row != self.header_line:
+            return
+        if text in self.names and text not in self.header.values():
+            self.header[letters] = text
+
+    def _start_data(self):
+        if len(self.filled_rows) < self.header_line:
+            raise UnsupportedSheet("blank row above the header")
+        self.columns = self.header
+        self.arrays = {letters: np.full(self.capacity, np.nan) for letters in self.columns}
+
+    def result(self, sheet_name):
+        if self.columns is None:
+            if self.header_line not in self.filled_rows:
+                raise UnsupportedSheet(f"{sheet_name} ends above the header row")
+            self._start_data()
+        result = {}
+        for letters, array in self.arrays.items():
+            name = self.columns[letters]
+            array = array[:self.filled]
+            if name in self.date_names:
+                array = self.workbook.to_datetime(array)
+            result[name] = array
+        return result
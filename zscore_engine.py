@@ -0,0 +1,351 @@
+import numpy as np
+
+# Value used for dates where only one side of a pair has data, matching the
+# fillna(0.01) applied to the aligned ratio in the original pairwise loop.
+MISSING_RATIO = 0.01
+# Upper bound on the number of elements in one dates x block x tickers slab.
+BLOCK_ELEMENTS = 1_000_000
+
+
+def align_series(series):
+    """Stack a list of date-indexed Series on their union date axis.
+
+    Returns (dates, values, present) where values is a dates x tickers float
+    array and present marks which ticker has a row on which date.
+    """
+    if not series:
+        return np.array([], dtype='datetime64[ns]'), np.empty((0, 0)), np.empty((0, 0), dtype=bool)
+    series = [s[~s.index.duplicated(keep='last')] for s in series]
+    dates = np.unique(np.concatenate([s.index.values for s in series]))
+    values = np.full((len(dates), len(series)), np.nan)
+    present = np.zeros((len(dates), len(series)), dtype=bool)
+    for k, s in enumerate(series):
+        rows = np.searchsorted(dates, s.index.values)
+        values[rows, k] = s.to_numpy(dtype=float)
+        present[rows, k] = True
+    return dates, values, present
+
+
+def _zscore(last, mean, std):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (last - mean) / std
+    return np.where(std != 0, z, np.nan)
+
+
+def self_zscores(values, present):
+    """Z-score of each ticker's latest value against its own history."""
+    data = np.where(present, values, np.nan)
+    valid = ~np.isnan(data)
+    count = valid.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.where(valid, data, 0.0).sum(axis=0) / count
+        dev = np.where(valid, data - mean, 0.0)
+        std = np.sqrt((dev * dev).sum(axis=0) / (count - 1))
+    std = np.where(count > 1, std, np.nan)
+    last_row = len(present) - 1 - np.argmax(present[::-1], axis=0)
+    last = values[last_row, np.arange(values.shape[1])]
+    return np.where(present.any(axis=0), _zscore(last, mean, std), np.nan)
+
+
+def _pair_zscores(values, present, left, right):
+    """Z-scores of the ratio left / right and of its reciprocal for paired ticker columns.
+
+    The ratio is divided out once per unordered pair and the reverse
+    orientation taken as its reciprocal; the masks, fill values, counts and
+    last-date lookups are shared by both orientations.
+    """
+    n_dates = len(values)
+    left_present = present[:, left]
+    right_present = present[:, right]
+    either = left_present | right_present
+    neither = ~either
+    count = either.sum(axis=0)
+    last_row = n_dates - 1 - np.argmax(either[::-1], axis=0)
+    columns = np.arange(len(left))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        forward = values[:, left] / values[:, right]
+        backward = 1.0 / forward
+    invalid = ~(left_present & right_present) | np.isnan(forward)
+    fill = np.where(either, MISSING_RATIO, 0.0)
+
+    zscores = []
+    for ratio in (forward, backward):
+        ratio = np.where(invalid, fill, ratio)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = ratio.sum(axis=0) / count
+            last = ratio[last_row, columns]
+            ratio -= mean
+            np.copyto(ratio, 0.0, where=neither)
+            std = np.sqrt(np.einsum('ij,ij->j', ratio, ratio) / (count - 1))
+        std = np.where(count > 1, std, np.nan)
+        zscores.append(np.where(count > 0, _zscore(last, mean, std), np.nan))
+    return zscores
+
+
+def relative_zscore_matrix(values, present, rows=None, cols=None):
+    """Comparative z-score matrix of PE_i / PE_j for every ordered pair of tickers.
+
+    values and present are dates x tickers arrays as returned by align_series.
+    Cell (i, j) is (last - mean) / std of the ratio series over the dates where
+    either ticker has data; dates covered by only one ticker count as 0.01.
+    The diagonal holds each ticker's own P/E z-score. rows and cols restrict
+    the result to those ticker positions (default: all). Cells (i, j) and
+    (j, i) are computed together from one ratio series and its reciprocal.
+    """
+    n_dates, n_tickers = values.shape
+    rows = np.arange(n_tickers) if rows is None else np.asarray(rows, dtype=int)
+    cols = np.arange(n_tickers) if cols is None else np.asarray(cols, dtype=int)
+    matrix = np.full((len(rows), len(cols)), np.nan)
+    if len(rows) == 0 or len(cols) == 0 or n_dates == 0:
+        return matrix
+
+    cell_rows = np.broadcast_to(rows[:, None], matrix.shape)
+    cell_cols = np.broadcast_to(cols[None, :], matrix.shape)
+    diagonal = cell_rows == cell_cols
+
+    # Every unordered pair needed by an off-diagonal cell, identified by lo * n + hi
+    lo = np.minimum(cell_rows, cell_cols)[~diagonal]
+    hi = np.maximum(cell_rows, cell_cols)[~diagonal]
+    pairs, cell_pair = np.unique(lo * n_tickers + hi, return_inverse=True)
+    left, right = pairs // n_tickers, pairs % n_tickers
+    forward = np.empty(len(pairs))
+    backward = np.empty(len(pairs))
+    block = max(1, BLOCK_ELEMENTS // n_dates)
+    for start in range(0, len(pairs), block):
+        chunk = slice(start, start + block)
+        forward[chunk], backward[chunk] = _pair_zscores(values, present, left[chunk], right[chunk])
+    matrix[~diagonal] = np.where(cell_rows[~diagonal] < cell_cols[~diagonal], forward[cell_pair], backward[cell_pair])
+
+    own = self_zscores(values, present)
+    matrix[diagonal] = own[cell_rows[diagonal]]
+    return matrix
+
+
+def _window_zscores(data, valid, last_present, starts, ends):
+    """Z-score of the last value in each [start, end) row window against the valid values in it.
+
+    data is a dates x columns array, valid marks the values that enter the mean
+    and standard deviation and last_present the rows that can supply the last
+    value. The dates are cut once at every window boundary and the sums of
+    each piece are accumulated, so the dates are read in one pass however many
+    windows there are. A window holding an infinite or NaN valid value gives
+    NaN, as the two-pass computation does, and variances within 1e-10 of zero
+    relative to the mean square (constant series up to rounding) count as zero.
+    """
+    n_dates, n_columns = data.shape
+    starts = np.asarray(starts)
+    ends = np.asarray(ends)
+    breaks = np.unique(np.concatenate([[0, n_dates], starts, ends]))
+    pieces = breaks[:-1]
+
+    def running(array, ufunc=np.add, empty=0.0):
+        # Value of ufunc over rows 0:b for every boundary b
+        reduced = ufunc.reduceat(array, pieces, axis=0)
+        out = np.empty((len(breaks), n_columns), dtype=reduced.dtype)
+        out[0] = empty
+        ufunc.accumulate(reduced, axis=0, out=out[1:])
+        return out
+
+    finite = np.isfinite(data)
+    clean = np.where(valid & finite, data, 0.0)
+    total = running(clean)
+    squares = running(clean * clean)
+    count = running(valid.astype(np.int64), empty=0)
+    bad = running((valid & ~finite).astype(np.int64), empty=0)
+    last_row = running(np.where(last_present, np.arange(n_dates)[:, None], -1), np.maximum, empty=-1)
+
+    s_pos = np.searchsorted(breaks, starts)
+    e_pos = np.searchsorted(breaks, ends)
+    n = count[e_pos] - count[s_pos]
+    s = total[e_pos] - total[s_pos]
+    q = squares[e_pos] - squares[s_pos]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = s / n
+        var = (q - s * mean) / (n - 1)
+        var = np.where(var > 1e-10 * np.abs(q / n), var, 0.0)
+    std = np.where(n > 1, np.sqrt(var), np.nan)
+
+    last_index = last_row[e_pos]
+    last = data[np.maximum(last_index, 0), np.arange(n_columns)]
+    ok = (last_index >= starts[:, None]) & (n > 0) & (bad[e_pos] == bad[s_pos])
+    return np.where(ok, _zscore(last, mean, std), np.nan)
+
+
+def window_zscore_stack(values, present, windows):
+    """Comparative z-score matrices for several date windows in one pass.
+
+    values and present are dates x tickers arrays as returned by align_series
+    and windows a list of (start_row, end_row) half-open row ranges. Matrix w
+    matches relative_zscore_matrix on rows start_row:end_row (up to rounding
+    in the last digits), but every window is read off the same running sums,
+    so W windows cost one pass over the dates plus O(N^2 * W). Returns a
+    windows x tickers x tickers array.
+    """
+    n_dates, n_tickers = values.shape
+    stack = np.full((len(windows), n_tickers, n_tickers), np.nan)
+    if n_dates == 0 or n_tickers == 0 or not windows:
+        return stack
+    starts = [start for start, _ in windows]
+    ends = [end for _, end in windows]
+
+    lo, hi = np.triu_indices(n_tickers, 1)
+    block = max(1, BLOCK_ELEMENTS // n_dates)
+    for start in range(0, len(lo), block):
+        left, right = lo[start:start + block], hi[start:start + block]
+        both = present[:, left] & present[:, right]
+        either = present[:, left] | present[:, right]
+        for numerator, denominator, target in ((left, right, (left, right)), (right, left, (right, left))):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratio = values[:, numerator] / values[:, denominator]
+            ratio = np.where(both & ~np.isnan(ratio), ratio, MISSING_RATIO)
+            stack[:, target[0], target[1]] = _window_zscores(ratio, either, either, starts, ends)
+
+    own = values
+    diagonal = np.arange(n_tickers)
+    stack[:, diagonal, diagonal] = _window_zscores(own, present & ~np.isnan(own), present, starts, ends)
+    return stack
+
+
+def rolling_zscores(data, valid, window, min_periods=None, months=None):
+    """Z-score of each value against the trailing window of its column.
+
+    data is a dates x series array and valid marks the values to use; each
+    column's mean and std (ddof=1) are taken over its valid values in the
+    window, all columns at once from running sums. With months, the sorted
+    month ordinal of each row, the window is the last window calendar months
+    however many rows they hold; without it, the last window rows. Rows that
+    are not valid, or whose window holds fewer than min_periods valid values
+    (default: half the window), come back NaN, as does a zero std.
+    """
+    if min_periods is None:
+        min_periods = window // 2
+    valid = valid & np.isfinite(data)
+    count = valid.sum(axis=0)
+    # Centre each column first so the running sums of squares keep their precision
+    with np.errstate(invalid='ignore'):
+        centre = np.where(count > 0, np.where(valid, data, 0.0).sum(axis=0) / np.maximum(count, 1), 0.0)
+    shifted = np.where(valid, data - centre, 0.0)
+
+    if months is None:
+        starts = np.maximum(np.arange(len(data)) - window + 1, 0)
+    else:
+        months = np.asarray(months)
+        starts = np.searchsorted(months, months - window + 1, side='left')
+
+    def trailing(array):
+        sums = np.zeros((len(array) + 1,) + array.shape[1:])
+        np.cumsum(array, axis=0, out=sums[1:])
+        return sums[1:] - sums[starts]
+
+    n = trailing(valid.astype(float))
+    total = trailing(shifted)
+    squares = trailing(shifted * shifted)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = total / n
+        var = (squares - total * mean) / (n - 1)
+        # Constant windows leave only rounding noise behind in var
+        var = np.where(var > 1e-10 * np.abs(squares / n), var, 0.0)
+        z = _zscore(shifted, mean, np.sqrt(var))
+    return np.where(valid & (n >= np.maximum(min_periods, 2)), z, np.nan)
+
+
+def rolling_pair_zscores(values, present, left, right, window, min_periods=None, months=None):
+    """Rolling z-score of values[:, left] / values[:, right] for each pair of columns.
+
+    Returns a dates x pairs array. A ratio is used only on dates where both
+    tickers have a finite value, as in the relative charts; see rolling_zscores.
+    """
+    left = np.asarray(left, dtype=int)
+    right = np.asarray(right, dtype=int)
+    z = np.full((len(values), len(left)), np.nan)
+    chunk = max(1, BLOCK_ELEMENTS // max(len(values), 1))
+    for begin in range(0, len(left), chunk):
+        l = left[begin:begin + chunk]
+        r = right[begin:begin + chunk]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = values[:, l] / values[:, r]
+        z[:, begin:begin + chunk] = rolling_zscores(ratio, present[:, l] & present[:, r], window, min_periods,
+                                                months)
+    return z
+
+
+class ZScoreMatrixHistory:
+    """Comparative z-score matrix after every date of a growing range, updated one date at a time.
+
+    Running sums of every pair's ratio (and of each ticker's own values on the
+    diagonal) are kept, so appending a date costs O(N^2) instead of a full
+    recompute. After appending the first t + 1 rows of values and present,
+    matrices[t] matches relative_zscore_matrix on those rows, up to rounding
+    in the last digits and with constant ratio series giving NaN, as in
+    window_zscore_stack.
+    """
+
+    def __init__(self, n_tickers):
+        shape = (n_tickers, n_tickers)
+        self.dates = []
+        self._matrices = []
+        self._stacked = None
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.total = np.zeros(shape)
+        self.squares = np.zeros(shape)
+        self.bad = np.zeros(shape, dtype=bool)
+        self.last = np.full(shape, np.nan)
+
+    def append(self, date, values, present, record=True):
+        """Add one date's row of values and present flags and return the updated matrix.
+
+        With record False the row only joins the running sums: no matrix is
+        computed or kept for date, and None is returned.
+        """
+        values = np.asarray(values, dtype=float)
+        present = np.asarray(present, dtype=bool)
+        both = present[:, None] & present[None, :]
+        either = present[:, None] | present[None, :]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = values[:, None] / values[None, :]
+        ratio = np.where(both & ~np.isnan(ratio), ratio, MISSING_RATIO)
+        valid = either.copy()
+        last_present = either.copy()
+        diagonal = np.arange(len(values))
+        ratio[diagonal, diagonal] = values
+        valid[diagonal, diagonal] = present & ~np.isnan(values)
+        last_present[diagonal, diagonal] = present
+
+        finite = np.isfinite(ratio)
+        clean = np.where(valid & finite, ratio, 0.0)
+        self.count += valid
+        self.total += clean
+        self.squares += clean * clean
+        self.bad |= valid & ~finite
+        self.last = np.where(last_present, ratio, self.last)
+
+        if not record:
+            return None
+        matrix = self.current()
+        self.dates.append(date)
+        self._matrices.append(matrix)
+        self._stacked = None
+        return matrix
+
+    def extend(self, dates, values, present, record=None):
+        """Append several rows in date order, keeping the matrix only after the rows marked in record (default: all)."""
+        for row, date in enumerate(dates):
+            self.append(date, values[row], present[row], True if record is None else record[row])
+
+    def current(self):
+        """The matrix over every date appended so far."""
+        n = self.count
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = self.total / n
+            var = (self.squares - self.total * mean) / (n - 1)
+            var = np.where(var > 1e-10 * np.abs(self.squares / n), var, 0.0)
+        std = np.where(n > 1, np.sqrt(var), np.nan)
+        return np.where((n > 0) & ~self.bad, _zscore(self.last, mean, std), np.nan)
+
+    @property
+    def matrices(self):
+        """dates x tickers x tickers array of the matrix after each recorded date, restacked only after an append."""
+        if self._stacked is None:
+            n_tickers = len(self.count)
+            self._stacked = np.stack(self._matrices) if self._matrices else np.empty((0, n_tickers, n_tickers))
+        return self._stacked